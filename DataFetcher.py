@@ -1,6 +1,7 @@
 
 import requests
 from PyQt5.QtCore import QThread, pyqtSignal
+from radarcore.fetchEngine import parse_aircraft
 
 class DataFetcher(QThread):
     data_fetched = pyqtSignal(list)
@@ -33,20 +34,7 @@ class DataFetcher(QThread):
                     return []
                 
                 # Map relevant fields to be used in the display
-                parsed_data = []
-                for ac in aircraft_data:
-                    parsed_data.append({
-                        'hex': ac.get('hex'),
-                        'flight': ac.get('flight'),
-                        'lat': ac.get('lat'),
-                        'lon': ac.get('lon'),
-                        'alt': ac.get('alt_baro'),  # Altitude in Barometric
-                        'gs': ac.get('gs'),  # Ground speed
-                        'track': ac.get('track'),
-                        'mag_heading': ac.get('mag_heading'),
-                        'emergency': ac.get('emergency'),
-                        'type' : ac.get('t')
-                    })
+                parsed_data = parse_aircraft(aircraft_data)
                     
                 return parsed_data
             else:
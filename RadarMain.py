@@ -1,15 +1,30 @@
+import time
+
+STARTUP_CLOCK = time.perf_counter()  # Before anything else is imported, for --profile-startup
+
 import sys
 import math
 import json
-from PyQt5.QtWidgets import *
-from PyQt5.QtGui import *
-from PyQt5.QtCore import *
-import tkinter as tk
-from collections import deque
-from TraconSelection import TraconSelectionDialog
-from geojsonLoader import GeoJsonLoader
-from DataFetcher import DataFetcher
-import os
+from array import array
+from PyQt5.QtWidgets import (
+    QAction, QApplication, QDialog, QFileDialog, QGridLayout, QInputDialog, QMainWindow, QMessageBox,
+    QPushButton, QVBoxLayout, QWidget,
+)
+from PyQt5.QtGui import QColor, QFont, QFontDatabase, QPainter, QPen, QPolygonF
+from PyQt5.QtCore import QPointF, Qt, QTimer, pyqtSignal
+from radarcore.trailStore import ProjectedTrails, TrailStore
+from radarcore.prediction import PredictionCache, HORIZONS_MIN
+from radarcore.geojsonLoader import GeoJsonLoader
+from radarcore.aircraftTable import SnapshotBuffer
+from radarcore.trafficFilter import TrafficFilter
+from radarcore.coveragePlanner import MAX_QUERY_RADIUS_NM, plan_coverage
+from radarcore.facilityCatalog import FacilityCatalog
+from radarcore.pollScheduler import query_radius
+from radarcore.projection import AzimuthalEquidistant, UNITS_PER_NM
+from trafficHub import TrafficHub
+from TraconSelection import TraconSelectionDialog, SplashScreen
+from mapCache import MapCache, CompiledMap
+from viewTransform import ViewTransform
 
 
 DCB_COLOR = "#3a3f40"
@@ -19,26 +34,29 @@ BUTTON_HEIGHT = 2
 DCB_HEIGHT = 80
 FONT = ("Roboto", 10)
 SCREEN_WIDTH = 800
+PIXELS_PER_NM = UNITS_PER_NM  # Radar units are pixels at scale 1
 
 
 class TRACONDisplay(QMainWindow):
-    def __init__(self, tracon_config):
+    map_ready = pyqtSignal(object)  # Future of a CompiledMap, emitted from the map worker thread
+
+    def __init__(self, tracon_config, splash=None, tracon_id=None, profile_startup=False, profile_output=None,
+                 hub=None, server=None):
         super().__init__()
+        self.profile_startup = profile_startup
+        self.profile_output = profile_output  # Also write the milestones here, a windowed build has no stdout
+        self.startup_metrics = {} if hub is None else None  # Only the first scope times the startup
+        self.mark_startup("imports")
 
         self.setCursor(Qt.CrossCursor)
 
-       # Load the font
-        font_id = QFontDatabase.addApplicationFont("Resources/fonts/Roboto_Mono/RobotoMono-Bold.ttf")
-        if font_id == -1:
-            print("Failed to load Roboto Mono font")
-        else:
-            print("Roboto Mono font loaded successfully")
-
+       # Load the font; Roboto Mono is only registered if it is picked from the Font Type menu
         font_id_2 = QFontDatabase.addApplicationFont("Resources/fonts/Share_Tech/ShareTech_Regular.ttf")
         if font_id_2 == -2:
             print("Failed to load ShareTech font")
         else:
             print("ShareTech font loaded successfully")
+        self.mark_startup("fonts")
 
 
         # Initial font size setup (10 is the default)
@@ -94,72 +112,133 @@ class TRACONDisplay(QMainWindow):
         font_menu.addAction(self.font_12_action)
         font_menu.addAction(self.font_14_action)
 
-        # Load TRACON configuration from an external file
-        self.tracon_config = self.load_tracon_config(tracon_config)
-
-        self.aircraft_positions = {}  # Store positions for each aircraft
-
-        # Get TRACON names from GeoJSON files in Resources directory
-        tracon_names = self.get_tracon_names_from_geojson_files()
-        dialog = TraconSelectionDialog(tracon_names)
-
-        if dialog.exec_() == QDialog.Accepted:
-            selected_tracon = dialog.get_selected_tracon()
-
-            # Ensure the selected TRACON exists, otherwise use a default like 'C90'
-            if selected_tracon in self.tracon_config:
-                self.tracon_config = self.tracon_config[selected_tracon]
-            else:
-                print(f"Selected TRACON {selected_tracon} not found, using default.")
-                self.tracon_config = self.tracon_config.get("C90", {})  # Use default config (C90) if not found
+        # Playback menu: scrub through recorded history in place of live traffic
+        playback_menu = self.menuBar.addMenu("Playback")
+        self.playback_open_action = QAction("Open Recording...", self)
+        self.playback_open_action.triggered.connect(self.open_recording)
+        self.playback_play_action = QAction("Play/Pause", self)
+        self.playback_play_action.triggered.connect(self.toggle_playback)
+        self.playback_seek_action = QAction("Seek To...", self)
+        self.playback_seek_action.triggered.connect(self.seek_playback_dialog)
+        self.playback_back_action = QAction("Back 1 Minute", self)
+        self.playback_back_action.triggered.connect(lambda: self.step_playback(-60))
+        self.playback_forward_action = QAction("Forward 1 Minute", self)
+        self.playback_forward_action.triggered.connect(lambda: self.step_playback(60))
+        self.playback_live_action = QAction("Return to Live", self)
+        self.playback_live_action.triggered.connect(self.return_to_live)
+
+        playback_menu.addAction(self.playback_open_action)
+        playback_menu.addAction(self.playback_play_action)
+        speed_menu = playback_menu.addMenu("Speed")
+        for speed in (1, 2, 4, 8, 16):
+            speed_action = QAction(f"{speed}x", self)
+            speed_action.triggered.connect(lambda checked, speed=speed: self.set_playback_speed(speed))
+            speed_menu.addAction(speed_action)
+        playback_menu.addAction(self.playback_seek_action)
+        playback_menu.addAction(self.playback_back_action)
+        playback_menu.addAction(self.playback_forward_action)
+        playback_menu.addAction(self.playback_live_action)
+        self.playback = None
+
+        # Vector menu: prediction line length and whether it follows the current turn
+        vector_menu = self.menuBar.addMenu("Vectors")
+        for minutes in HORIZONS_MIN:
+            vector_action = QAction(f"{minutes:g} min", self)
+            vector_action.triggered.connect(lambda checked, minutes=minutes: self.set_vector_length(minutes))
+            vector_menu.addAction(vector_action)
+        self.turn_vector_action = QAction("Follow Turns", self)
+        self.turn_vector_action.setCheckable(True)
+        self.turn_vector_action.toggled.connect(self.set_turn_vectors)
+        vector_menu.addAction(self.turn_vector_action)
+        self.vectors_enabled = True
+        self.predictions = PredictionCache(minutes=1)
+
+        # Scope menu: more windows on the same traffic, each with its own facility and view
+        scope_menu = self.menuBar.addMenu("Scope")
+        self.new_scope_action = QAction("New Scope...", self)
+        self.new_scope_action.triggered.connect(self.open_scope)
+        scope_menu.addAction(self.new_scope_action)
+
+        if hub is None:
+            selected_tracon = self.select_tracon(tracon_config, splash, tracon_id)
         else:
-            print("No TRACON selected. Exiting...")
-            sys.exit()
+            # Another scope on a running hub: facilities, maps and traffic are already there
+            self.tracon_configs = hub.tracon_configs
+            self.map_cache = hub.map_cache
+            selected_tracon = tracon_id
+        self.mark_startup("dialog")
+
+        # Ensure the selected TRACON exists, otherwise use a default like 'C90'
+        if selected_tracon in self.tracon_configs:
+            self.tracon_config = self.tracon_configs[selected_tracon]
+            self.tracon_id = selected_tracon
+        else:
+            print(f"Selected TRACON {selected_tracon} not found, using default.")
+            self.tracon_config = self.tracon_configs.get("C90", {})  # Use default config (C90) if not found
+            self.tracon_id = "C90"
 
         # Initialize radar settings and center after TRACON selection
         self.radar_lat, self.radar_lon = self.tracon_config["radar_settings"]["lat_lon"]
-        self.scale_factor = self.tracon_config["radar_settings"]["scale_factor"]
 
+        # Rings and targets only need the projection; the video map fills in when its worker is done
+        self.projection = AzimuthalEquidistant(self.radar_lat, self.radar_lon)
+        self.predictions.set_projection(self.projection)
+        self.compiled_map = None
 
-        # Initialize offset
-        self.offset = QPointF(0, 0)  # Initialize the offset for dragging/zooming
         self.dragging = False
         
 
-        # Set the radar center based on screen geometry
+        # Set the radar center based on screen geometry; pan and zoom live in one view transform
         screen_geometry = self.screen().geometry()
         screen_center = screen_geometry.center()
-        self.radar_center = QPointF(screen_center.x(), screen_center.y())  # Initialize radar_center
+        self.view = ViewTransform(
+            QPointF(screen_center.x(), screen_center.y()), self.tracon_config["radar_settings"]["scale_factor"]
+        )
+        self.aircraft_xy = (array("d"), array("d"))  # Projected positions of the front table's rows
+        self.trail_xy = ProjectedTrails()  # This scope's trails, projected as they grow
 
+        self.map_lines = []  # Video map polylines in projected coordinates
+        self.map_polygons = []  # (colour, fill path) per style
+        self.map_points = []  # (point, label) symbols in projected coordinates
         self.geojson_loader = GeoJsonLoader()
-        self.load_geojson_data(self.tracon_config["geojson_file"])
 
         # Other initialization continues...
 
-        self.aircraft_data = []
+        # One ingest pipeline and track store for every scope in the process. This
+        # scope's filters run on the ingest thread with the others' at publish time.
+        # Given a track server, the pipeline mirrors its stream instead of polling
+        if hub is None:
+            hub = TrafficHub(self.tracon_configs, self.tracon_id, self.map_cache, server)
+        self.hub = hub
+        traffic_filter = TrafficFilter.from_config(
+            self.tracon_config.get("filters", {}), (self.radar_lat, self.radar_lon)
+        )
+        self.aircraft_positions = hub.core.trails  # Replaced by a private store while playing back
+        self.aircraft_data = hub.core.aircraft_data
+        self.visible = []  # Rows of aircraft_data this scope shows
         self.highlighted_states = {}        
         # Remove the call to self.load_aircraft_data()
 
         # Initialize the selected TRACON's display
-        version = "v1.2.0"
-        self.setWindowTitle(f"RadarView {version} :: {self.tracon_config['tracon_name']}")
+        self.version = "v1.2.0"
+        self.setWindowTitle(f"RadarView {self.version} :: {self.tracon_config['tracon_name']}")
         self.showMaximized()
 
-        # Load GeoJSON for the selected TRACON
-        try:
-            with open(self.tracon_config["geojson_file"], "r") as f:
-                geojson_data = json.load(f)
-                self.geojson_loader.load(geojson_data)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load GeoJSON file: {e}")
+        # Provisional until the map is ready: the configured coverage or a circle around the radar
+        self.coverage_circles = plan_coverage(self.tracon_config, self.geojson_loader)
+        self.map_ready.connect(self.on_map_ready)
+        self.map_cache.request(self.tracon_id).add_done_callback(self.map_ready.emit)
 
-        # Data fetcher setup (use the correct lat, lon, and distance)
-        self.data_fetcher = DataFetcher(self.radar_lat, self.radar_lon, dist=100)  # Example: 150 miles distance
-        self.data_fetcher.data_fetched.connect(self.update_aircraft_data)
+        hub.attach(self, traffic_filter)
+        hub.snapshot_ready.connect(self.update_aircraft_data)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.start_fetching_data)
-        self.timer.start(2000)  # Fetch data every 5 seconds
+        # TRACON menu: switch facility without restarting, nearby ones are compiled in the background
+        tracon_menu = self.menuBar.addMenu("TRACON")
+        for tracon_id in sorted(self.map_cache.tracon_configs):
+            tracon_action = QAction(self.tracon_configs[tracon_id].get("tracon_name", tracon_id), self)
+            tracon_action.triggered.connect(lambda checked, tracon_id=tracon_id: self.switch_tracon(tracon_id))
+            tracon_menu.addAction(tracon_action)
+        self.map_cache.preload(self.map_cache.neighbours(self.tracon_id))
 
         print(f"TRACONDisplay initialized for {self.tracon_config['tracon_name']}.")
         # Set central widget with layout
@@ -196,6 +275,51 @@ class TRACONDisplay(QMainWindow):
         # Add widgets to layout
         self.main_layout.addWidget(self.dcbStrip)      # DCB at the top
 
+    def select_tracon(self, tracon_config, splash, tracon_id):
+        """First scope: load the facility configs, start compiling maps and ask which TRACON to open."""
+        # Load TRACON configuration from an external file
+        self.tracon_config = self.load_tracon_config(tracon_config)
+        self.mark_startup("config")
+
+        # Get TRACON names from GeoJSON files in Resources directory, through the on-disk catalog
+        self.catalog = FacilityCatalog()
+        self.catalog.refresh()
+        tracon_names = self.get_tracon_names_from_geojson_files()
+
+        # Facilities without an entry in the config are centred and scaled from their map's extent
+        configured = set(self.tracon_config)
+        for facility_id in list(tracon_names):
+            if facility_id not in self.tracon_config:
+                config = self.catalog.config_for(facility_id)
+                if config is None:
+                    print(f"Skipping {facility_id}: its map has no geometry to centre on")
+                    tracon_names.remove(facility_id)
+                    continue
+                self.tracon_config[facility_id] = config
+
+        # Compiled maps of recently used facilities stay cached so switching TRACON is instant.
+        # Compiling starts now, in the background, while the user is still choosing
+        self.map_cache = MapCache({
+            tracon_id: config for tracon_id, config in self.tracon_config.items()
+            if tracon_id in tracon_names
+        })
+        self.map_cache.preload(sorted(self.map_cache.tracon_configs)[:self.map_cache.capacity])
+
+        if tracon_id is not None:
+            selected_tracon = tracon_id  # Given on the command line, no dialog
+            if splash is not None:
+                splash.close()
+        else:
+            dialog = TraconSelectionDialog(tracon_names, catalog=self.catalog, configured=configured)
+            if splash is not None:
+                splash.finish(dialog)  # Closes the moment the dialog is up
+            if dialog.exec_() != QDialog.Accepted:
+                print("No TRACON selected. Exiting...")
+                sys.exit()
+            selected_tracon = dialog.get_selected_tracon()
+        self.tracon_configs = self.tracon_config
+        return selected_tracon
+
     def create_buttons(self, button_layout):
         # Define the custom layout pattern
         layout_pattern = [
@@ -304,7 +428,17 @@ class TRACONDisplay(QMainWindow):
         print("TOOLS button clicked")
 
     def button_8_action(self):
-        print("VECTOR ON/OFF button clicked")
+        self.vectors_enabled = not self.vectors_enabled
+        self.update()
+
+    def set_vector_length(self, minutes):
+        self.predictions.set_horizon(minutes)
+        self.vectors_enabled = True
+        self.update()
+
+    def set_turn_vectors(self, turn_aware):
+        self.predictions.set_turn_aware(turn_aware)
+        self.update()
 
     def button_9_action(self):
         print("TEMP DATA button clicked")
@@ -313,23 +447,22 @@ class TRACONDisplay(QMainWindow):
         print("DB AREA button clicked")
 
     def reset_view_action(self):
-        self.offset = QPointF(0, 0)
-        self.scale_factor = 1.0
+        self.view.reset()
         self.update()
         print("View reset")
 
     def zoom_in_action(self):
-        self.scale_factor *= 1.2
+        self.view.zoom(1.2)
         self.update()
         print("Zoomed in")
 
     def zoom_out_action(self):
-        self.scale_factor /= 1.2
+        self.view.zoom(1 / 1.2)
         self.update()
         print("Zoomed out")
 
     def refresh_data_action(self):
-        self.start_fetching_data()
+        self.hub.poll()
         print("Data refreshed")
 
     def exit_application_action(self):
@@ -340,6 +473,9 @@ class TRACONDisplay(QMainWindow):
 
 
     def set_stars_font(self, font_name, font_size):
+        if font_name == "Roboto Mono" and font_name not in QFontDatabase().families():
+            if QFontDatabase.addApplicationFont("Resources/fonts/Roboto_Mono/RobotoMono-Bold.ttf") == -1:
+                print("Failed to load Roboto Mono font")
         font = QFont(font_name, font_size)
         
         
@@ -359,86 +495,271 @@ class TRACONDisplay(QMainWindow):
             QMessageBox.critical(self, "Error", f"Failed to load TRACON configuration: {e}")
             sys.exit()
 
-    def load_geojson_data(self, geojson_file):
-        """Load GeoJSON data for the selected TRACON."""
+    def load_compiled_map(self, tracon_id):
+        """The compiled map for a facility, or an empty one centred on its radar if the map won't load."""
         try:
-            with open(geojson_file, "r") as file:
-                geojson_data = json.load(file)
-                self.geojson_loader.load(geojson_data)
+            return self.map_cache.get(tracon_id)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load GeoJSON file: {e}")
+            config = self.tracon_configs[tracon_id]
+            lat, lon = config["radar_settings"]["lat_lon"]
+            return CompiledMap(tracon_id, config, GeoJsonLoader(), AzimuthalEquidistant(lat, lon), [], [(lat, lon, 100)])
 
+    def on_map_ready(self, future):
+        """GUI thread: show a compiled map once the worker has finished it."""
+        try:
+            compiled = future.result()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to load GeoJSON file: {e}")
+            return
+        if compiled.tracon_id != self.tracon_id or self.compiled_map is not None:
+            return  # Switched away, or already loaded synchronously
+        self.apply_compiled_map(compiled)
+        self.mark_startup("map_ready")
+        self.update()
+
+    def apply_compiled_map(self, compiled):
+        self.compiled_map = compiled
+        self.geojson_loader = compiled.loader
+        self.map_lines = compiled.lines
+        self.map_polygons = compiled.polygons
+        self.map_points = compiled.points
+        self.coverage_circles = compiled.coverage  # Used from the next poll on
+
+    def mark_startup(self, name):
+        """Record how long after launch a startup milestone was reached, once."""
+        if self.startup_metrics is None or name in self.startup_metrics:
+            return
+        self.startup_metrics[name] = time.perf_counter() - STARTUP_CLOCK
+        print(f"Startup: {name} after {self.startup_metrics[name]:.3f}s")
+        if self.profile_startup and "first_frame" in self.startup_metrics and "map_ready" in self.startup_metrics:
+            self.report_startup()
+            QTimer.singleShot(0, self.close)
+
+    def report_startup(self):
+        """Print each startup phase's own duration, then the raw milestones on one parseable line."""
+        print("Startup profile:")
+        previous = 0.0
+        for name, elapsed in sorted(self.startup_metrics.items(), key=lambda item: item[1]):
+            print(f"  {name:<12} {(elapsed - previous) * 1000:8.1f} ms  (at {elapsed * 1000:.1f} ms)")
+            previous = elapsed
+        print("startup-profile " + json.dumps(self.startup_metrics))
+        if self.profile_output:
+            with open(self.profile_output, "w") as f:
+                json.dump(self.startup_metrics, f)
+
+    def switch_tracon(self, tracon_id):
+        """Retarget the display and the fetch engine to another facility without rebuilding the window."""
+        if tracon_id == self.tracon_id:
+            return
+        compiled = self.load_compiled_map(tracon_id)
+        self.tracon_id = tracon_id
+        self.tracon_config = compiled.config
+        self.radar_lat, self.radar_lon = compiled.config["radar_settings"]["lat_lon"]
+        self.projection = compiled.projection
+        self.predictions.set_projection(self.projection)
+        self.apply_compiled_map(compiled)
+        self.view.reset(compiled.config["radar_settings"]["scale_factor"])
+
+        self.hub.set_filter(self, TrafficFilter.from_config(
+            compiled.config.get("filters", {}), (self.radar_lat, self.radar_lon)
+        ))
+        # Exports are partitioned by the first scope's facility
+        core = self.hub.core
+        if core.track_exporter is not None and core.scopes[0] is self:
+            core.track_exporter.tracon = tracon_id
+        self.aircraft_xy = self.projection.forward_many(
+            self.aircraft_data.lat[:self.aircraft_data.size], self.aircraft_data.lon[:self.aircraft_data.size]
+        )
+
+        if self.playback is None:
+            self.setWindowTitle(f"RadarView {self.version} :: {self.tracon_config['tracon_name']}")
+        self.hub.poll()  # Poll the new coverage now rather than at the next tick
+        self.update()
+        self.map_cache.preload(self.map_cache.neighbours(tracon_id))
+
+    def open_scope(self):
+        """Open another scope window on the same traffic, for a facility picked from a list."""
+        names = sorted(self.map_cache.tracon_configs)
+        tracon_id, ok = QInputDialog.getItem(
+            self, "New Scope", "TRACON:", names, names.index(self.tracon_id) if self.tracon_id in names else 0, False
+        )
+        if ok:
+            TRACONDisplay(None, tracon_id=tracon_id, hub=self.hub).show()
 
     def get_tracon_names_from_geojson_files(self):
         """Retrieve available TRACON names from GeoJSON files."""
-        tracon_names = []
-        geojson_directory = r"Resources/tracons"
-        
-        for filename in os.listdir(geojson_directory):
-            if filename.endswith(".geojson"):
-                tracon_names.append(filename.replace(".geojson", ""))
-
-        return tracon_names
+        return self.catalog.ids()
 
     def draw_geojson_lines(self, painter):
-        """Draw lines from the GeoJSON data with zoom and offset adjustments."""
+        """Draw the video map's polygons, lines and symbols through the view transform."""
+        # Everything is prebuilt in projected coordinates, Qt applies pan and zoom
+        painter.save()
+        painter.setTransform(self.view.transform)
+        painter.setPen(Qt.NoPen)
+        for color, path in self.map_polygons:
+            fill = QColor(color) if color else QColor(255, 255, 255)
+            fill.setAlpha(40)
+            painter.setBrush(fill)
+            painter.drawPath(path)
+
         pen = QPen(QColor(255, 255, 255, 127))  # White lines with 50% transparency (alpha = 127)
         pen.setWidth(1)
+        pen.setCosmetic(True)  # One pixel wide whatever the zoom
         painter.setPen(pen)
+        painter.setBrush(Qt.NoBrush)
+        for polyline in self.map_lines:
+            painter.drawPolyline(polyline)
+        painter.restore()
+
+        # Symbols and labels stay the same size, so only their positions are transformed
+        transform = self.view.transform
+        for point, label in self.map_points:
+            screen = transform.map(point)
+            if label:
+                painter.drawText(screen, label)
+            else:
+                painter.drawRect(int(screen.x()) - 1, int(screen.y()) - 1, 3, 3)
+
+    def visible_range_nm(self):
+        """Distance in nm from the middle of the window to its corner at the current zoom."""
+        half_diagonal = math.hypot(self.width(), self.height()) / 2
+        return half_diagonal / (self.view.scale * PIXELS_PER_NM)
+
+    def view_center_latlon(self):
+        """Latitude and longitude under the middle of the window."""
+        x, y = self.view.unmap(QPointF(self.width() / 2, self.height() / 2))
+        return self.projection.inverse(x, y)
+
+    def circles_for_view(self):
+        """Query only what's on screen when zoomed in, otherwise the full coverage."""
+        visible_nm = self.visible_range_nm()
+        dist = query_radius(visible_nm, MAX_QUERY_RADIUS_NM)
+        if dist >= max(circle[2] for circle in self.coverage_circles):
+            return self.coverage_circles
+        lat, lon = self.view_center_latlon()
+        return [(lat, lon, dist)]
+
+    def update_aircraft_data(self):
+        """Pick up the newest snapshot, live from the hub or from playback, with this scope's rows."""
+        if self.playback is None:
+            # The hub has already swapped it in and recorded trails for every scope
+            table = self.hub.core.aircraft_data
+            self.visible = table.scope_visible.get(self, table.visible)
+        else:
+            table = self.playback.snapshots.swap()
+            self.visible = table.visible
+            now = table.timestamp  # Recorded time, so sampling and pruning follow the playback speed
+            trails = self.aircraft_positions
+            for i in table.visible:
+                trails.record(table.hex[i] or table.flight[i], table.lat[i], table.lon[i], now)
+            trails.prune(now - 120)  # Tracks that dropped out of coverage
+        self.aircraft_data = table
+        if self.visible:
+            self.mark_startup("first_target")
+
+        # Prediction vectors and projected positions are computed here once per update, paint only reads them
+        self.predictions.update(table, self.visible)
+        self.aircraft_xy = self.projection.forward_many(table.lat[:table.size], table.lon[:table.size])
+        self.trail_xy.update(
+            self.aircraft_positions, self.projection, [table.hex[i] or table.flight[i] for i in self.visible]
+        )
 
-        # Draw each line from the GeoJSON data
-        for feature in self.geojson_loader.get_lines():
-            coordinates = feature["geometry"]["coordinates"]
-            for i in range(len(coordinates) - 1):
-                # Map coordinates to radar coordinates and apply zoom/offset
-                start_point = self.map_to_radar_coords(coordinates[i][1], coordinates[i][0])
-                end_point = self.map_to_radar_coords(coordinates[i+1][1], coordinates[i+1][0])
+        # Update radar display
+        self.update()
 
-                # If either of the points is out of bounds (0, 0), skip drawing
-                if start_point == (0, 0) or end_point == (0, 0):
-                    continue
+    def open_recording(self):
+        """Pick a history database and switch the display to playing it back."""
+        from radarcore.trackHistory import DEFAULT_HISTORY_PATH
+        history = self.tracon_config.get("history", {})
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Open Recording", history.get("path", DEFAULT_HISTORY_PATH), "SQLite (*.sqlite *.db);;All files (*)"
+        )
+        if not path:
+            return
+        self.start_playback(path)
+
+    def start_playback(self, path):
+        """Show recorded traffic from path; live ingest keeps running and recording behind it."""
+        from playback import PlaybackSource
+        self.stop_playback()
+        playback = PlaybackSource(
+            SnapshotBuffer(traffic_filter=self.hub.core.snapshots.scope_filters[self]), path, parent=self
+        )
+        first, last = playback.time_range()
+        if first is None:
+            playback.stop()
+            QMessageBox.information(self, "Playback", "The recording has no traffic in it.")
+            return
 
-                # Apply zoom and offset
-                start_point = QPointF(self.radar_center.x() + start_point[0] * self.scale_factor + self.offset.x(),
-                                    self.radar_center.y() - start_point[1] * self.scale_factor + self.offset.y())
-                end_point = QPointF(self.radar_center.x() + end_point[0] * self.scale_factor + self.offset.x(),
-                                    self.radar_center.y() - end_point[1] * self.scale_factor + self.offset.y())
+        self.hub.snapshot_ready.disconnect(self.update_aircraft_data)
+        self.playback = playback
+        # Recorded trails stay out of the live store the other scopes draw from
+        trails = self.tracon_config.get("trails", {})
+        self.aircraft_positions = TrailStore(
+            minutes=trails.get("minutes", 5), sample_seconds=trails.get("sample_seconds", 2.0)
+        )
+        playback.snapshot_ready.connect(self.update_aircraft_data)
+        playback.position_changed.connect(self.on_playback_position)
+        self.seek_playback(first)
 
-                painter.drawLine(start_point, end_point)
+    def stop_playback(self):
+        if self.playback is None:
+            return
+        self.playback.stop()
+        self.playback = None
+        self.aircraft_positions = self.hub.core.trails
+        self.hub.snapshot_ready.connect(self.update_aircraft_data)
 
-    def start_fetching_data(self):
-        if not self.data_fetcher.isRunning():
-            self.data_fetcher.start()
+    def return_to_live(self):
+        if self.playback is None:
+            return
+        self.stop_playback()
+        self.setWindowTitle(f"RadarView {self.version} :: {self.tracon_config['tracon_name']}")
+        self.update_aircraft_data()
 
-    def update_aircraft_data(self, new_data):
-        """Update the aircraft data and store positions for trails."""
-        self.aircraft_data = new_data
+    def toggle_playback(self):
+        if self.playback is None:
+            return
+        if self.playback.is_playing():
+            self.playback.pause()
+        else:
+            self.playback.play()
 
-        # Iterate over the new data
-        for aircraft in new_data:
-            aircraft_id = aircraft.get("flight", "N/A")
-            lat = aircraft.get("lat")
-            lon = aircraft.get("lon")
+    def set_playback_speed(self, speed):
+        if self.playback is not None:
+            self.playback.set_speed(speed)
 
-            # Ensure lat and lon are numeric
-            try:
-                lat = float(lat)
-                lon = float(lon)
-            except (ValueError, TypeError):
-                print(f"ERROR: Non-numeric position data for aircraft {aircraft_id} (lat={lat}, lon={lon})")
-                continue  # Skip this aircraft if conversion fails
+    def seek_playback(self, position):
+        """Jump playback to a unix time, clamped to the recording."""
+        first, last = self.playback.time_range()
+        self.aircraft_positions.clear()  # Trails from before the jump would draw across the gap
+        self.playback.seek(min(max(position, first), last))
 
-            # Update position history if valid
-            if aircraft_id not in self.aircraft_positions:
-                self.aircraft_positions[aircraft_id] = deque(maxlen=8)  # Limit to last 8 positions
-            self.aircraft_positions[aircraft_id].append((lat, lon))
+    def step_playback(self, seconds):
+        if self.playback is not None:
+            self.seek_playback(self.playback.position + seconds)
 
-            # Restore highlighted state
-            highlighted = self.highlighted_states.get(aircraft_id, False)
-            aircraft["highlighted"] = highlighted
+    def seek_playback_dialog(self):
+        if self.playback is None:
+            return
+        current = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.playback.position))
+        text, ok = QInputDialog.getText(self, "Seek", "Local time (YYYY-MM-DD HH:MM:SS):", text=current)
+        if not ok:
+            return
+        try:
+            position = time.mktime(time.strptime(text.strip(), "%Y-%m-%d %H:%M:%S"))
+        except ValueError:
+            QMessageBox.warning(self, "Seek", f"Not a valid time: {text}")
+            return
+        self.seek_playback(position)
 
-        # Update radar display
-        self.update()
+    def on_playback_position(self, position):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(position))
+        speed = f"{self.playback.speed:g}x" if self.playback.is_playing() else "paused"
+        self.setWindowTitle(
+            f"RadarView {self.version} :: {self.tracon_config['tracon_name']} :: PLAYBACK {stamp} ({speed})"
+        )
 
     def set_font_size(self, size):
         """Set font size based on selected option."""
@@ -449,6 +770,7 @@ class TRACONDisplay(QMainWindow):
 
     def paintEvent(self, event):
         """Handle paint event to render radar, geoJSON, and aircraft trails."""
+        self.mark_startup("first_frame")
         painter = QPainter(self)
         painter.fillRect(self.rect(), QColor(0, 0, 0))  # Black background
 
@@ -464,59 +786,46 @@ class TRACONDisplay(QMainWindow):
     def draw_radar(self, painter):
         pen = QPen(QColor(200, 200, 200, 100))  # Grey-white rings
         pen.setWidth(1)
+        pen.setCosmetic(True)
         painter.setPen(pen)
+        painter.setBrush(Qt.NoBrush)
+        painter.save()
+        painter.setTransform(self.view.transform)
         for i in range(1, 10):
-            painter.drawEllipse(self.radar_center + self.offset, i * 80 * self.scale_factor, i * 80 * self.scale_factor)
+            painter.drawEllipse(QPointF(0, 0), i * 80, i * 80)
+        painter.restore()
 
 
     def draw_aircraft(self, painter):
-        for aircraft in self.aircraft_data:
+        # Only rows that passed the traffic filter when the snapshot was published
+        table = self.aircraft_data
+        xs, ys = self.aircraft_xy
+        for i in self.visible:
             try:
-                lat = aircraft.get("lat")
-                lon = aircraft.get("lon")
-                alt = aircraft.get("alt", 0)  # Default to 0 if 'alt' is not provided
-                callsign = aircraft.get("flight", "N/A")
-                speed = aircraft.get('gs', 0)
-                if speed != "N/A":
-                    speed = int(speed)
+                if i >= len(xs) or xs[i] != xs[i]:
+                    continue  # Out of radar range
+                # Ground targets and reports without an altitude pass some filters, their alt is NaN
+                alt = table.alt[i]
+                if table.ground[i]:
+                    altitude = "GND"
+                elif alt == alt:
+                    altitude = f"{int(alt) // 100:03}"
                 else:
-                    speed = 0  # Default speed if 'gs' is unavailable or invalid
-                track = aircraft.get("track", 0)  # Track angle in degrees
-
-                if isinstance(speed, str) and speed.lower() == "ground":
-                    continue  # Skip this aircraft
-
-                # Skip aircraft if altitude is non-numeric or indicates 'ground'
-                if isinstance(lat, (int, float)) and isinstance(lon, (int, float)):
-                    x, y = self.map_to_radar_coords(lat, lon)
-
-                # Convert altitude to integer
-                alt = int(alt)
-
-                # Skip aircraft above 18,000 feet
-                if alt > 18000:
-                    continue
-
-                # Validate data
-                if lat is None or lon is None:
-                    continue
+                    altitude = "---"
+                callsign = table.flight[i]
+                speed = table.gs[i]
+                speed = int(speed) if speed == speed else 0  # Default speed if 'gs' is unavailable
+                track = table.track[i]  # Track angle in degrees
+                if track != track:
+                    track = 0
 
                 # Draw aircraft trail
-                self.draw_aircraft_trail(aircraft, painter)
+                self.draw_aircraft_trail(table.hex[i] or callsign, painter)
 
-                # Map coordinates to radar screen
-                x, y = self.map_to_radar_coords(lat, lon)
-                x = self.radar_center.x() + (x * self.scale_factor) + self.offset.x()
-                y = self.radar_center.y() - (y * self.scale_factor) + self.offset.y()
-
-                # **Prediction Logic:**
-                # Calculate the predicted position in 1 minute
-                predicted_lat, predicted_lon = self.predict_position(lat, lon, track, speed)
-
-                # Map predicted coordinates to radar screen
-                predicted_x, predicted_y = self.map_to_radar_coords(predicted_lat, predicted_lon)
-                predicted_x = self.radar_center.x() + (predicted_x * self.scale_factor) + self.offset.x()
-                predicted_y = self.radar_center.y() - (predicted_y * self.scale_factor) + self.offset.y()
+                # Projected at the last update, only the view transform is applied here
+                position = self.view.map(xs[i], ys[i])
+                x = position.x()
+                y = position.y()
 
 
                 # Calculate leader line endpoint
@@ -525,7 +834,7 @@ class TRACONDisplay(QMainWindow):
 
 
                 # Inside your drawing logic for aircraft, check if the aircraft is highlighted
-                highlighted = aircraft.get("highlighted", False)
+                highlighted = self.highlighted_states.get(callsign, False)
 
                 # If highlighted, use a different text color
                 if highlighted:
@@ -544,13 +853,19 @@ class TRACONDisplay(QMainWindow):
                 # Now draw the text with the appropriate color
                 painter.setPen(text_color)
                 painter.drawText(QPointF(leader_end_x + 5, leader_end_y - 5), callsign)
-                painter.drawText(QPointF(leader_end_x + 5, leader_end_y + 10), f"{alt // 100:03} {speed}")
+                painter.drawText(QPointF(leader_end_x + 5, leader_end_y + 10), f"{altitude} {speed}")
 
 
 
-                # Draw the line from the blue aircraft dot to the predicted position
-                painter.setPen(QPen(QColor(255, 255, 255), 1))  # White line with thickness 1
-                painter.drawLine(QPointF(x, y), QPointF(predicted_x, predicted_y))  # Line from aircraft to predicted position
+                # Draw the prediction vector from the blue aircraft dot, cached at the last update
+                if self.vectors_enabled:
+                    painter.setPen(QPen(QColor(255, 255, 255), 1))  # White line with thickness 1
+                    vector = QPolygonF([QPointF(xs[i], ys[i])])
+                    for predicted_x, predicted_y in self.predictions.points_xy(i):
+                        if predicted_x != predicted_x:
+                            break  # Runs off the edge of radar range
+                        vector.append(QPointF(predicted_x, predicted_y))
+                    painter.drawPolyline(self.view.transform.map(vector))
 
                 circle_radius = 6
                 painter.setBrush(QColor(31, 122, 255, 255))  # Blue color for aircraft
@@ -564,126 +879,46 @@ class TRACONDisplay(QMainWindow):
             except Exception as e:
                 print(f"Error drawing aircraft: {e}")
                 
-    def predict_position(self, lat, lon, heading, speed):
-        # Earth's radius in meters
-        R = 6371000  
-        
-        # Convert speed from knots to meters per second
-        speed_mps = speed * 0.514444
-
-        # Distance traveled in 1 minute
-        distance = speed_mps * 60  
-
-        # Convert heading to radians
-        heading_rad = math.radians(heading)
-
-        # Convert latitude and longitude to radians
-        lat_rad = math.radians(lat)
-        lon_rad = math.radians(lon)
-
-        # Predict new latitude
-        predicted_lat_rad = math.asin(
-            math.sin(lat_rad) * math.cos(distance / R) +
-            math.cos(lat_rad) * math.sin(distance / R) * math.cos(heading_rad)
-        )
-
-        # Predict new longitude
-        predicted_lon_rad = lon_rad + math.atan2(
-            math.sin(heading_rad) * math.sin(distance / R) * math.cos(lat_rad),
-            math.cos(distance / R) - math.sin(lat_rad) * math.sin(predicted_lat_rad)
-        )
-
-        # Convert back to degrees
-        predicted_lat = math.degrees(predicted_lat_rad)
-        predicted_lon = math.degrees(predicted_lon_rad)
-
-        return predicted_lat, predicted_lon
-
-    def draw_aircraft_trail(self, aircraft, painter):
+    def draw_aircraft_trail(self, aircraft_id, painter):
         """Draw the trail for the aircraft."""
-        aircraft_id = aircraft.get("flight", "N/A")
-        if aircraft_id not in self.aircraft_positions:
+        projected = self.trail_xy.get(aircraft_id)
+        if projected is None:
             return
 
-        # Get the last positions of the aircraft in reverse order (newest first)
-        positions = list(self.aircraft_positions[aircraft_id])[::-1]
+        # Projected at the last update; newest first, thinned so dots are at least 6 px apart at this zoom
+        xs, ys = projected
+        min_spacing = 6 / self.view.scale
+        positions = []
+        last_x = last_y = math.inf
+        for j in range(len(xs) - 1, -1, -1):
+            x = xs[j]
+            y = ys[j]
+            if x != x or abs(x - last_x) + abs(y - last_y) < min_spacing:
+                continue  # Out of range, or too close to the last dot
+            positions.append(self.view.map(x, y))
+            last_x = x
+            last_y = y
+        fade = 205 / max(len(positions), 1)
 
         # Draw circles for the trail
-        for i, (lat, lon) in enumerate(positions):
-            # Map the coordinates to radar screen
-            x, y = self.map_to_radar_coords(lat, lon)
-            x = self.radar_center.x() + (x * self.scale_factor) + self.offset.x()
-            y = self.radar_center.y() - (y * self.scale_factor) + self.offset.y()
+        for i, position in enumerate(positions):
 
             # Adjust color intensity for fading effect
             # The first circle is fully blue, and the color fades with each older position
-            alpha_value = max(255 - i * 30, 50)  # Fade effect, stops at a certain opacity
+            alpha_value = int(255 - i * fade)  # Fades to 50 at the oldest position, however long the trail
             color = QColor(27,110,224, alpha_value)  # Blue with fading alpha
 
             painter.setBrush(color)
             painter.setPen(Qt.NoPen)
 
             # Draw the trail circle
-            painter.drawEllipse(QPointF(x, y), 4, 4)  # Smaller circles for the trail
-
-    def map_to_radar_coords(self, lat, lon):
-        """Map latitude and longitude to radar coordinates."""
-        
-        # Check if lat and lon are not sequences (lists or tuples)
-        if isinstance(lat, (list, tuple)) or isinstance(lon, (list, tuple)):
-            print(f"ERROR: lat or lon is a sequence (lat={lat}, lon={lon})")
-            return 0, 0  # Return early if the values are invalid
+            painter.drawEllipse(position, 4, 4)  # Smaller circles for the trail
 
-        # Ensure lat and lon are floats
-        lat = float(lat)
-        lon = float(lon)
-
-        # Calculate distance from radar center
-        center_lat, center_lon = self.radar_lat, self.radar_lon
-        distance = self.haversine(center_lat, center_lon, lat, lon)
-
-        if distance > 200 * 1609.34:  # Ignore coordinates farther than 200 miles (in meters)
-            return 0, 0  # Return a value outside the radar view
-
-        scale = 800  # Adjust the scale for your coordinate system
-        x = (lon - center_lon) * scale * math.cos(math.radians(center_lat))  # Adjust for latitude
-        y = (lat - center_lat) * scale
-        return x, y
-
-
-        
-    def assign_sector(self, lat, lon, alt):
-        """Assign aircraft to a TRACON sector based on position or altitude."""
-        if alt < 10000:
-            return "F"
-        elif 10000 <= alt < 20000:
-            return "V"
-        elif 20000 <= alt < 30000:
-            return "A"
-        else:
-            return "H"
-
-
-    def haversine(self, lat1, lon1, lat2, lon2):
-        """Calculate the distance in meters between two lat/lon points."""
-        R = 6371000  # Radius of the Earth in meters
-        phi1 = math.radians(lat1)
-        phi2 = math.radians(lat2)
-        delta_phi = math.radians(lat2 - lat1)
-        delta_lambda = math.radians(lon2 - lon1)
-
-        a = math.sin(delta_phi / 2) * math.sin(delta_phi / 2) + \
-            math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) * math.sin(delta_lambda / 2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-        distance = R * c  # Distance in meters
-        return distance
-    
     def mouseMoveEvent(self, event):
         """Handle mouse move event for dragging."""
         if self.dragging:
             delta = event.pos() - self.last_pos
-            self.offset += delta
+            self.view.pan(delta)
             self.last_pos = event.pos()
             self.update()
 
@@ -710,20 +945,7 @@ class TRACONDisplay(QMainWindow):
 
     def zoom_at(self, mouse_pos, zoom_factor):
         """Zoom based on the mouse position."""
-        mouse_x = mouse_pos.x()
-        mouse_y = mouse_pos.y()
-
-        # Calculate the current mouse position in the radar's coordinate system
-        mouse_radar_x = mouse_x - self.radar_center.x() - self.offset.x()
-        mouse_radar_y = mouse_y - self.radar_center.y() - self.offset.y()
-
-        # Apply the zoom factor
-        self.scale_factor *= zoom_factor
-
-        # Recalculate the offset based on the zoom center (mouse position)
-        self.offset.setX(self.offset.x() - mouse_radar_x * (zoom_factor - 1))
-        self.offset.setY(self.offset.y() - mouse_radar_y * (zoom_factor - 1))
-
+        self.view.zoom_at(mouse_pos, zoom_factor)
         self.update()
 
 
@@ -739,25 +961,31 @@ class TRACONDisplay(QMainWindow):
 
         # Handle CTRL + Click (Middle button click for aircraft selection)
         elif event.button() == Qt.MiddleButton:
-            click_pos = event.pos()
-            for aircraft in self.aircraft_data:
-                lat = aircraft.get("lat")
-                lon = aircraft.get("lon")
-                x, y = self.map_to_radar_coords(lat, lon)
-                x = self.radar_center.x() + (x * self.scale_factor) + self.offset.x()
-                y = self.radar_center.y() - (y * self.scale_factor) + self.offset.y()
+            # Compare in projected coordinates: one inverse transform instead of mapping every aircraft
+            click_x, click_y = self.view.unmap(event.pos())
+            circle_radius = 15 / self.view.scale
+            table = self.aircraft_data
+            xs, ys = self.aircraft_xy
+            for i in self.visible:
+                if i >= len(xs):
+                    continue
 
                 # Check if click is within the circle's radius
-                circle_radius = 15
-                if (click_pos.x() - x) ** 2 + (click_pos.y() - y) ** 2 <= circle_radius ** 2:
+                if (click_x - xs[i]) ** 2 + (click_y - ys[i]) ** 2 <= circle_radius ** 2:
                     # Toggle highlighted state
-                    callsign = aircraft.get("flight")
+                    callsign = table.flight[i]
                     if callsign:
-                        aircraft["highlighted"] = not aircraft.get("highlighted", False)
-                        self.highlighted_states[callsign] = aircraft["highlighted"]
+                        self.highlighted_states[callsign] = not self.highlighted_states.get(callsign, False)
                     self.update()  # Refresh the UI
                     break
             
+    def closeEvent(self, event):
+        """Leave the hub; closing the last scope stops the fetch engine, history writer and exporter."""
+        self.stop_playback()
+        self.hub.snapshot_ready.disconnect(self.update_aircraft_data)
+        self.hub.detach(self)
+        super().closeEvent(event)
+
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_F11:
             if self.isFullScreen():
@@ -768,12 +996,33 @@ class TRACONDisplay(QMainWindow):
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="RadarView TRACON display")
+    parser.add_argument("--tracon", help="Open this TRACON (e.g. C90) without the selection dialog")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print per-phase startup timings and exit once the scope and map are up")
+    parser.add_argument("--profile-output", help="With --profile-startup, also write the timings to this JSON file")
+    parser.add_argument("--server", help="Follow a headless track server (host:port) instead of polling adsb.lol")
+    args, qt_args = parser.parse_known_args()
+
+    server = None
+    if args.server:
+        from radarcore.trackServer import parse_address
+        server = parse_address(args.server)
+
+    app = QApplication(sys.argv[:1] + qt_args)
 
     tracon_config_file = r"Resources/.TraconConfig"
 
+    splash = SplashScreen()
+    splash.show()
+    app.processEvents()
+
     # Initialize and show the TRACON display
-    radar_display = TRACONDisplay(tracon_config_file)
+    radar_display = TRACONDisplay(
+        tracon_config_file, splash, args.tracon, args.profile_startup, args.profile_output, server=server
+    )
     radar_display.show()
 
     sys.exit(app.exec_())
@@ -0,0 +1,87 @@
+"""Cold-start benchmark for RadarMain, from the source tree and from the PyInstaller build.
+
+Each run launches a fresh process with --profile-startup, which exits on its
+own once the scope has painted and the video map is in, and collects the
+per-phase milestones it writes. Run from the repository root:
+
+    python Resources/coldStartBench.py --runs 5 --tracon C90
+    python Resources/coldStartBench.py --build      # pyinstaller RadarMain.spec first
+
+The OS file cache is not flushed between runs, so the first run is the
+closest to a true cold start and is reported separately.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = ("imports", "fonts", "config", "dialog", "first_frame", "map_ready")
+
+
+def frozen_executable():
+    """Path of the one-file build RadarMain.spec produces, or None if it hasn't been built."""
+    name = "RadarMain.exe" if sys.platform == "win32" else "RadarMain"
+    path = os.path.join(REPO_ROOT, "dist", name)
+    return path if os.path.exists(path) else None
+
+
+def run_once(command, tracon, timeout):
+    """Launch once and return (wall seconds, milestones dict)."""
+    fd, output = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        subprocess.run(
+            command + ["--profile-startup", "--profile-output", output, "--tracon", tracon],
+            cwd=REPO_ROOT, timeout=timeout, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False,
+        )
+        wall = time.perf_counter() - start
+        with open(output) as f:
+            content = f.read()
+        return wall, json.loads(content) if content else {}
+    finally:
+        os.remove(output)
+
+
+def bench(label, command, runs, tracon, timeout):
+    results = [run_once(command, tracon, timeout) for _ in range(runs)]
+    if not any(milestones for _, milestones in results):
+        print(f"{label}: no profile written, did the app start?")
+        return
+
+    print(f"{label} ({runs} runs)")
+    first_wall, first = results[0]
+    print(f"  first run      {first_wall * 1000:8.1f} ms wall")
+    print(f"  median run     {statistics.median(wall for wall, _ in results) * 1000:8.1f} ms wall")
+    for phase in PHASES:
+        times = [milestones[phase] for _, milestones in results if phase in milestones]
+        if times:
+            print(f"  {phase:<14} {statistics.median(times) * 1000:8.1f} ms  (first run {first.get(phase, 0) * 1000:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tracon", default="C90")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--build", action="store_true", help="Run pyinstaller RadarMain.spec before benchmarking")
+    args = parser.parse_args()
+
+    bench("source", [sys.executable, "RadarMain.py"], args.runs, args.tracon, args.timeout)
+
+    if args.build:
+        subprocess.run([sys.executable, "-m", "PyInstaller", "--noconfirm", "RadarMain.spec"], cwd=REPO_ROOT, check=True)
+    executable = frozen_executable()
+    if executable is None:
+        print("PyInstaller build: dist/ has no RadarMain build, skipped (use --build)")
+    else:
+        bench("PyInstaller build", [executable], args.runs, args.tracon, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Fan-out benchmark for the headless track server, with in-process stand-in clients.
+
+Synthetic traffic is published through a SnapshotBuffer with a TrackServer as
+its sink, exactly as the server's TrafficCore does, while stand-in clients on
+one asyncio thread decode the stream like TrackClient does. One real
+TrackClient also mirrors it into a buffer of its own. At the end every client's
+state is checked against the server's. Run from the repository root:
+
+    python Resources/fanoutBench.py --aircraft 1000 --clients 1,10,100
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from radarcore.aircraftTable import SnapshotBuffer
+from radarcore.trackServer import TrackClient, TrackDecoder, TrackServer
+
+CENTER = (41.98, -87.90)
+
+
+class Traffic:
+    """Aircraft flying straight lines around CENTER, with a few arriving and leaving every frame."""
+
+    def __init__(self, count, churn):
+        self.churn = churn
+        self.next_id = 0
+        self.aircraft = [self._new() for _ in range(count)]
+
+    def _new(self):
+        self.next_id += 1
+        return {
+            "hex": f"{self.next_id:06x}", "flight": f"TST{self.next_id % 10000}",
+            "lat": CENTER[0] + random.uniform(-2, 2), "lon": CENTER[1] + random.uniform(-2.5, 2.5),
+            "alt": random.randrange(0, 40000, 100), "gs": random.uniform(120, 480),
+            "track": random.uniform(0, 360), "type": random.choice(("B738", "A320", "E75L", "C172")),
+            "squawk": f"{random.randrange(8 ** 4):04o}", "pos_time": time.time(),
+        }
+
+    def step(self, now):
+        for _ in range(self.churn):
+            self.aircraft[random.randrange(len(self.aircraft))] = self._new()
+        for ac in self.aircraft:
+            if random.random() < 0.1:
+                continue  # No new position this frame
+            nm = ac["gs"] / 3600
+            ac["lat"] += nm / 60 * math.cos(math.radians(ac["track"]))
+            ac["lon"] += nm / 60 * math.sin(math.radians(ac["track"])) / math.cos(math.radians(ac["lat"]))
+            ac["pos_time"] = now
+
+    def fill(self, table, now):
+        for ac in self.aircraft:
+            i = table.new_row()
+            table.index[ac["hex"]] = i
+            table.set_row(
+                i, ac["hex"], ac["flight"], ac["lat"], ac["lon"], ac["alt"], ac["gs"], ac["track"], None,
+                None, ac["type"], ac["squawk"], now - ac["pos_time"],
+            )
+
+
+class StandIn:
+    """A subscriber that decodes the stream and keeps score."""
+
+    def __init__(self):
+        self.decoder = TrackDecoder()
+        self.frames = 0
+        self.bytes = 0
+        self.latencies = []
+
+    async def run(self, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while True:
+                data = await reader.read(1 << 16)
+                if not data:
+                    break
+                self.bytes += len(data)
+                applied = self.decoder.feed(data)
+                if applied and self.decoder.timestamp:  # Not the empty keyframe sent on connect
+                    self.frames += applied
+                    self.latencies.append(time.time() - self.decoder.timestamp)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (OSError, asyncio.CancelledError):
+                pass
+
+
+def state_of(decoder):
+    """Comparable form of a decoder's aircraft (NaN compares unequal to itself)."""
+    return repr(sorted(decoder.aircraft.items()))
+
+
+async def start_all(stand_ins, port):
+    return [asyncio.create_task(s.run(port)) for s in stand_ins]
+
+
+async def cancel_all(tasks):
+    """Cancel the stand-ins and wait for them, so their sockets close while the loop still runs."""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def bench(aircraft, clients, frames, interval, churn):
+    server = TrackServer(port=0)
+    port = server.start()
+    # Time the two halves of the server's work: encoding on the ingest thread, diff and writes on its own
+    encode_times, fanout_times = [], []
+    submit, publish = server.submit, server._publish
+
+    def timed(func, times):
+        def wrapper(*args):
+            t0 = time.perf_counter()
+            func(*args)
+            times.append(time.perf_counter() - t0)
+        return wrapper
+
+    server.submit = timed(submit, encode_times)
+    server._publish = timed(publish, fanout_times)
+    snapshots = SnapshotBuffer()
+    snapshots.sinks.append(server)
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    stand_ins = [StandIn() for _ in range(clients)]
+    tasks = asyncio.run_coroutine_threadsafe(start_all(stand_ins, port), loop).result()
+    mirror = SnapshotBuffer()
+    track_client = TrackClient(mirror, "127.0.0.1", port)
+    track_client.start()
+    deadline = time.monotonic() + 10
+    while len(server.clients) < clients + 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    traffic = Traffic(aircraft, churn)
+    start = time.perf_counter()
+    for _ in range(frames):
+        now = time.time()
+        traffic.step(now)
+        with snapshots.writing() as table:
+            traffic.fill(table, now)
+        if interval:
+            time.sleep(interval)
+
+    # Wait for every subscriber to have applied the last frame
+    final = table.timestamp
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if all(s.decoder.timestamp == final for s in stand_ins) and mirror.swap().timestamp >= final:
+            break
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+
+    reference = TrackDecoder()
+    reference.feed(server.keyframe())
+    expected = state_of(reference)
+    consistent = sum(state_of(s.decoder) == expected for s in stand_ins)
+    mirrored = mirror.front()
+    mirror_ok = len(mirrored) == len(reference.aircraft) and all(
+        abs(mirrored.lat[mirrored.index[key]] - values[0]) < 1e-9 for key, values in reference.aircraft.items()
+    )
+
+    track_client.stop()
+    server.stop()
+    asyncio.run_coroutine_threadsafe(cancel_all(tasks), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+    keyframe_bytes = len(server.keyframe())
+    received = sum(s.bytes for s in stand_ins)
+    latencies = sorted(latency for s in stand_ins for latency in s.latencies)
+    print(f"{aircraft} aircraft, {clients} stand-in clients + 1 TrackClient, {frames} frames")
+    print(f"  keyframe       {keyframe_bytes / 1024:8.1f} kB ({keyframe_bytes / aircraft:.0f} B per aircraft)")
+    print(f"  mean delta     {(server.bytes_sent - keyframe_bytes * (clients + 1)) / (frames * (clients + 1)) / 1024:8.1f} kB")
+    print(f"  encode         {statistics.median(encode_times) * 1000:8.2f} ms median per frame (ingest thread)")
+    print(f"  diff + writes  {statistics.median(fanout_times) * 1000:8.2f} ms median per frame (server thread)")
+    print(f"  delivered      {received / elapsed / 1e6:8.1f} MB/s, {sum(s.frames for s in stand_ins) / elapsed:.0f} frames/s to stand-ins")
+    if latencies:
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"  latency        {statistics.median(latencies) * 1000:8.2f} ms median, {p99 * 1000:.2f} ms p99")
+    print(f"  consistent     {consistent}/{clients} stand-ins, TrackClient {'ok' if mirror_ok else 'MISMATCH'}")
+    return consistent == clients and mirror_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--aircraft", type=int, default=1000)
+    parser.add_argument("--clients", default="1,10,100", help="Comma-separated subscriber counts to run")
+    parser.add_argument("--frames", type=int, default=40)
+    parser.add_argument("--interval", type=float, default=0.5,
+                        help="Seconds between frames, 0 to publish flat out (the stand-ins then measure themselves)")
+    parser.add_argument("--churn", type=int, default=5, help="Aircraft replaced per frame")
+    args = parser.parse_args()
+
+    ok = True
+    for clients in (int(n) for n in args.clients.split(",")):
+        ok = bench(args.aircraft, clients, args.frames, args.interval, args.churn) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
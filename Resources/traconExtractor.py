@@ -1,54 +1,265 @@
+"""Index, search and extract CRC video map libraries.
+
+Files are scanned in a process pool into a persistent SQLite index next to
+the library: every word of every string value, every feature property and
+each file's bounding box. Re-indexing only rescans files whose size or mtime
+changed, so searches after the first run are answered from the index.
+
+    python traconExtractor.py index  C:\\CRC\\VideoMaps\\ZSE
+    python traconExtractor.py search C:\\CRC\\VideoMaps\\ZSE pdx
+    python traconExtractor.py extract C:\\CRC\\VideoMaps\\ZSE Resources\\tracons pdx
+"""
+import argparse
+import json
 import os
+import re
 import shutil
-import json
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+INDEX_NAME = ".traconindex.sqlite"
+WORD = re.compile(r"[a-z0-9]+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    min_lon REAL, min_lat REAL, max_lon REAL, max_lat REAL
+);
+CREATE TABLE IF NOT EXISTS terms (term TEXT NOT NULL, file_id INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS terms_term ON terms(term);
+CREATE INDEX IF NOT EXISTS terms_file ON terms(file_id);
+CREATE TABLE IF NOT EXISTS properties (key TEXT NOT NULL, value TEXT NOT NULL, file_id INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS properties_key_value ON properties(key, value);
+CREATE INDEX IF NOT EXISTS properties_file ON properties(file_id);
+"""
+
+
+def scan_file(path):
+    """Worker: (path, terms, properties, bbox) for one GeoJSON file, or (path, error)."""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            geojson_data = json.load(file)
+    except (OSError, ValueError) as e:
+        return path, str(e)
+
+    terms = set()
+    properties = set()
+    bbox = [float("inf"), float("inf"), float("-inf"), float("-inf")]
+
+    def walk(data):
+        if isinstance(data, dict):
+            for value in data.values():
+                walk(value)
+        elif isinstance(data, list):
+            for item in data:
+                walk(item)
+        elif isinstance(data, str):
+            value = data.lower()
+            terms.add(value)  # The whole value too, so multi-word names match exactly
+            terms.update(WORD.findall(value))
+
+    def extend(coordinates):
+        # Positions are [lon, lat, ...]; anything nested deeper is a list of positions
+        if coordinates and isinstance(coordinates[0], (int, float)):
+            lon, lat = coordinates[0], coordinates[1]
+            if lon == 0 and lat == 0:
+                return  # Null-island placeholder points
+            bbox[0] = min(bbox[0], lon)
+            bbox[1] = min(bbox[1], lat)
+            bbox[2] = max(bbox[2], lon)
+            bbox[3] = max(bbox[3], lat)
+        else:
+            for item in coordinates:
+                extend(item)
+
+    walk(geojson_data)
+    features = geojson_data.get("features", []) if isinstance(geojson_data, dict) else []
+    for feature in features:
+        for key, value in (feature.get("properties") or {}).items():
+            if isinstance(value, (str, int, float, bool)):
+                properties.add((key.lower(), str(value).lower()))
+        geometry = feature.get("geometry") or {}
+        extend(geometry.get("coordinates") or [])
+
+    return path, sorted(terms), sorted(properties), (bbox if bbox[0] <= bbox[2] else None)
+
+
+class VideoMapIndex:
+    """Persistent inverted index of a folder of GeoJSON video maps."""
+
+    def __init__(self, source_folder, index_path=None):
+        self.source_folder = os.path.abspath(source_folder)
+        self.connection = sqlite3.connect(index_path or os.path.join(self.source_folder, INDEX_NAME))
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def update(self, workers=None):
+        """Rescan new and changed files in a process pool; returns (scanned, removed, failed)."""
+        on_disk = {}
+        for root, _, filenames in os.walk(self.source_folder):
+            for filename in filenames:
+                if filename.endswith(".geojson"):
+                    path = os.path.join(root, filename)
+                    stat = os.stat(path)
+                    on_disk[os.path.relpath(path, self.source_folder)] = (stat.st_mtime, stat.st_size)
+
+        indexed = {
+            path: (file_id, mtime, size)
+            for file_id, path, mtime, size in self.connection.execute("SELECT id, path, mtime, size FROM files")
+        }
+        removed = [indexed[path][0] for path in indexed if path not in on_disk]
+        stale = [
+            path for path, (mtime, size) in on_disk.items()
+            if path not in indexed or indexed[path][1:] != (mtime, size)
+        ]
+
+        failed = 0
+        with self.connection:
+            self._forget(removed + [indexed[path][0] for path in stale if path in indexed])
+            if stale:
+                full_paths = [os.path.join(self.source_folder, path) for path in stale]
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    for result in pool.map(scan_file, full_paths, chunksize=16):
+                        if len(result) == 2:
+                            print(f"Error processing {result[0]}: {result[1]}")
+                            failed += 1
+                            # Still recorded, with nothing to find, so it isn't rescanned until it changes
+                            result = (result[0], [], [], None)
+                        self._store(os.path.relpath(result[0], self.source_folder), on_disk, *result[1:])
+        return len(stale), len(removed), failed
+
+    def _forget(self, file_ids):
+        for file_id in file_ids:
+            self.connection.execute("DELETE FROM terms WHERE file_id = ?", (file_id,))
+            self.connection.execute("DELETE FROM properties WHERE file_id = ?", (file_id,))
+            self.connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
 
-def search_and_copy_geojson_files(source_folder, destination_folder, keyword):
+    def _store(self, path, on_disk, terms, properties, bbox):
+        mtime, size = on_disk[path]
+        file_id = self.connection.execute(
+            "INSERT INTO files (path, mtime, size, min_lon, min_lat, max_lon, max_lat) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, mtime, size, *(bbox or (None, None, None, None))),
+        ).lastrowid
+        self.connection.executemany("INSERT INTO terms VALUES (?, ?)", ((term, file_id) for term in terms))
+        self.connection.executemany(
+            "INSERT INTO properties VALUES (?, ?, ?)", ((key, value, file_id) for key, value in properties)
+        )
+
+    def search(self, keyword=None, properties=(), bbox=None, substring=False):
+        """Relative paths of files matching every given condition.
+
+        keyword matches a whole word or string value, or any part of one with
+        substring=True; properties are (key, value) pairs a feature must have;
+        bbox is (min_lon, min_lat, max_lon, max_lat) the file's extent must overlap.
+        """
+        conditions = []
+        params = []
+        if keyword:
+            if substring:
+                conditions.append("id IN (SELECT file_id FROM terms WHERE instr(term, ?) > 0)")
+            else:
+                conditions.append("id IN (SELECT file_id FROM terms WHERE term = ?)")
+            params.append(keyword.lower())
+        for key, value in properties:
+            conditions.append("id IN (SELECT file_id FROM properties WHERE key = ? AND value = ?)")
+            params += [key.lower(), value.lower()]
+        if bbox:
+            conditions.append("max_lon >= ? AND min_lon <= ? AND max_lat >= ? AND min_lat <= ?")
+            params += [bbox[0], bbox[2], bbox[1], bbox[3]]
+        where = " AND ".join(conditions) or "1"
+        return [path for path, in self.connection.execute(f"SELECT path FROM files WHERE {where} ORDER BY path", params)]
+
+
+def search_and_copy_geojson_files(source_folder, destination_folder, keyword, substring=True, **conditions):
+    """Copy every map in source_folder mentioning keyword into destination_folder, via the index.
+
+    Maps keep their path relative to source_folder, so same-named maps from
+    different subfolders don't overwrite each other.
+    """
     # Check if source and destination folders exist
     if not os.path.exists(source_folder):
         print(f"Source folder '{source_folder}' does not exist.")
-        return
+        return []
     if not os.path.exists(destination_folder):
         print(f"Destination folder '{destination_folder}' does not exist.")
+        return []
+
+    index = VideoMapIndex(source_folder)
+    try:
+        index.update()
+        matches = index.search(keyword, substring=substring, **conditions)
+    finally:
+        index.close()
+
+    for path in matches:
+        source_file = os.path.join(source_folder, path)
+        destination_file = os.path.join(destination_folder, path)
+        # Unchanged copies from an earlier extraction are left alone
+        if os.path.exists(destination_file) and os.path.getmtime(destination_file) >= os.path.getmtime(source_file):
+            continue
+        os.makedirs(os.path.dirname(destination_file), exist_ok=True)
+        shutil.copy2(source_file, destination_file)
+        print(f"Copied '{path}' to '{destination_folder}'")
+    return matches
+
+
+def _parse_property(text):
+    key, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected key=value, got {text!r}")
+    return key, value
+
+
+def _parse_bbox(text):
+    values = [float(part) for part in text.split(",")]
+    if len(values) != 4:
+        raise argparse.ArgumentTypeError("expected min_lon,min_lat,max_lon,max_lat")
+    return values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index, search and extract CRC video map libraries")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = commands.add_parser("index", help="Build or refresh the index of a library")
+    index_parser.add_argument("source")
+    index_parser.add_argument("--workers", type=int)
+
+    for name in ("search", "extract"):
+        command = commands.add_parser(name, help=f"{name.capitalize()} maps matching a keyword and filters")
+        command.add_argument("source")
+        if name == "extract":
+            command.add_argument("destination")
+        command.add_argument("keyword", nargs="?")
+        command.add_argument("--property", type=_parse_property, action="append", default=[],
+                             help="Feature property key=value the map must contain (repeatable)")
+        command.add_argument("--bbox", type=_parse_bbox, help="min_lon,min_lat,max_lon,max_lat the map must overlap, e.g. --bbox=-123.5,45,-122,46")
+        command.add_argument("--substring", action="store_true", help="Match the keyword anywhere inside values")
+    args = parser.parse_args(argv)
+
+    if args.command == "extract":
+        search_and_copy_geojson_files(
+            args.source, args.destination, args.keyword, substring=args.substring,
+            properties=args.property, bbox=args.bbox,
+        )
         return
-    
-    # Search for geojson files and check the content for the keyword
-    for filename in os.listdir(source_folder):
-        if filename.endswith(".geojson"):
-            source_file = os.path.join(source_folder, filename)
-            
-            try:
-                # Open and read the GeoJSON file
-                with open(source_file, 'r', encoding='utf-8') as file:
-                    geojson_data = json.load(file)
-                    
-                    # Check if the keyword exists in the content
-                    # This checks all properties, not just specific keys
-                    def search_recursive(data):
-                        if isinstance(data, dict):
-                            for key, value in data.items():
-                                if isinstance(value, (dict, list)):
-                                    if search_recursive(value):
-                                        return True
-                                elif isinstance(value, str) and keyword.lower() in value.lower():
-                                    return True
-                        elif isinstance(data, list):
-                            for item in data:
-                                if search_recursive(item):
-                                    return True
-                        return False
-                    
-                    # If keyword found in any part of the file, copy it
-                    if search_recursive(geojson_data):
-                        destination_file = os.path.join(destination_folder, filename)
-                        shutil.copy(source_file, destination_file)
-                        print(f"Copied '{filename}' to '{destination_folder}'")
-            
-            except Exception as e:
-                print(f"Error processing {filename}: {e}")
-
-# Example usage
-source_folder = r"C:\Users\abbym\Documents\CRC\VideoMaps\ZSE"  # Replace with the path to the source folder
-destination_folder = r"C:\Users\abbym\Documents\RadarView\Resources\tracons"  # Replace with the path to the destination folder
-keyword = input("Enter the keyword to search for in the file content: ")  # You can enter 'pdx' or any other keyword
-
-search_and_copy_geojson_files(source_folder, destination_folder, keyword)
+
+    index = VideoMapIndex(args.source)
+    try:
+        scanned, removed, failed = index.update(getattr(args, "workers", None))
+        print(f"Index updated: {scanned} scanned, {removed} removed, {failed} failed", file=sys.stderr)
+        if args.command == "search":
+            for path in index.search(args.keyword, args.property, args.bbox, args.substring):
+                print(path)
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,11 @@
 import sys
-import requests
-import math
-import json
-from PyQt5.QtWidgets import *
-from PyQt5.QtGui import *
-from PyQt5.QtCore import *
-import os
-from collections import deque
-
 import os
+from PyQt5.QtWidgets import (
+    QApplication, QComboBox, QDialog, QHBoxLayout, QLabel, QLineEdit, QPushButton, QSplashScreen, QVBoxLayout,
+    QWidget,
+)
+from PyQt5.QtGui import QPainter, QPixmap
+from PyQt5.QtCore import Qt
 
 
 class SplashScreen(QSplashScreen):
@@ -19,27 +16,14 @@ class SplashScreen(QSplashScreen):
         super().__init__(pixmap)
         self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint)
 
-    def main():
-        app = QApplication(sys.argv)
-
-        # Create and show the splash screen
-        splash = SplashScreen()
-        splash.show()
-
-        # Set a timer to close the splash screen after 10 seconds and show the main dialog
-        QTimer.singleShot(10000, splash.close)
-        QTimer.singleShot(10000, lambda: TraconSelectionDialog(app))
-
-        sys.exit(app.exec_())
-
-    if __name__ == "__main__":
-        main()
-
 
 class TraconSelectionDialog(QDialog):
-    def __init__(self, tracon_names, parent=None):
+    def __init__(self, tracon_names, parent=None, catalog=None, configured=None):
 
         super().__init__(parent)
+        self.tracon_names = list(tracon_names)
+        self.catalog = catalog  # FacilityCatalog for search and preview, optional
+        self.configured = configured  # Ids with an entry in .TraconConfig, the rest get auto-centred
         self.setWindowTitle("Select TRACON")
 
         # Set the window size and make it center-aligned
@@ -73,11 +57,32 @@ class TraconSelectionDialog(QDialog):
             text-align: center;
         """)
 
+        # Search box narrowing the list as you type
+        self.searchBox = QLineEdit(container)
+        self.searchBox.setPlaceholderText("Search facilities...")
+        self.searchBox.textChanged.connect(self.filter_tracons)
+        container_layout.addWidget(self.searchBox)
+        self.searchBox.setStyleSheet("""
+            background-color: #4C4C4C;
+            font-size: 16px;
+            padding: 10px;
+            border-radius: 8px;
+            border: 1px solid #888;
+            color: #E1E1E1;
+        """)
+
         # ComboBox for TRACON names
         self.comboBox = QComboBox(container)
-        self.comboBox.addItems(tracon_names)
+        self.comboBox.addItems(self.tracon_names)
+        self.comboBox.currentTextChanged.connect(self.show_preview)
         container_layout.addWidget(self.comboBox)
 
+        # Catalog details of the highlighted facility
+        self.preview = QLabel(container)
+        self.preview.setStyleSheet("font-size: 14px; color: #E1E1E1;")
+        container_layout.addWidget(self.preview)
+        self.show_preview(self.comboBox.currentText())
+
         # Style the comboBox with smooth edges and modern font
         self.comboBox.setStyleSheet("""
             QComboBox {
@@ -141,6 +146,32 @@ class TraconSelectionDialog(QDialog):
 
         layout.addWidget(container)  # Add the container with all elements to the main layout
 
+    def filter_tracons(self, text):
+        """Show only facilities whose id or map name contains the search text."""
+        if self.catalog is not None:
+            matches = [name for name in self.catalog.search(text) if name in self.tracon_names]
+        else:
+            matches = [name for name in self.tracon_names if text.strip().lower() in name.lower()]
+        self.comboBox.clear()
+        self.comboBox.addItems(matches)
+
+    def show_preview(self, tracon_id):
+        if self.catalog is None or tracon_id not in self.catalog.entries:
+            self.preview.setText("")
+            return
+        entry = self.catalog.entries[tracon_id]
+        lines = [entry.get("name") or tracon_id, f"{entry['features']} features, {entry['vertices']} vertices"]
+        if entry["center"]:
+            lat, lon = entry["center"]
+            min_lon, min_lat, max_lon, max_lat = entry["bbox"]
+            lines.append(f"Centre {lat:.3f}, {lon:.3f}   extent {max_lat - min_lat:.2f}° x {max_lon - min_lon:.2f}°")
+        colors = entry.get("palette", {}).get("color")
+        if colors:
+            lines.append(f"{len(colors)} colours: " + ", ".join(list(colors)[:6]))
+        if self.configured is not None and tracon_id not in self.configured:
+            lines.append("Not in .TraconConfig, will be centred on its map")
+        self.preview.setText("\n".join(lines))
+
     def get_selected_tracon(self):
         """Return the selected TRACON name."""
         return self.comboBox.currentText()
@@ -151,5 +182,24 @@ class TraconSelectionDialog(QDialog):
         super().paintEvent(event)
 
 
+def main():
+    app = QApplication(sys.argv)
+
+    # Show the splash only until the selection dialog is ready, not for a fixed time
+    splash = SplashScreen()
+    splash.show()
+    app.processEvents()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    tracon_names = [
+        filename[:-len(".geojson")]
+        for filename in os.listdir(os.path.join(base_dir, "Resources", "tracons"))
+        if filename.endswith(".geojson")
+    ]
+    dialog = TraconSelectionDialog(tracon_names)
+    splash.finish(dialog)
+    dialog.exec_()
 
 
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ from PyQt5.QtGui import QPainter, QColor, QPen, QFont,QFontDatabase
 from PyQt5.QtCore import Qt, QPointF, QTimer
 from collections import deque
 from TraconSelection import TraconSelectionDialog
-from geojsonLoader import GeoJsonLoader
+from radarcore.geojsonLoader import GeoJsonLoader
 from DataFetcher import DataFetcher
 import os
 
@@ -0,0 +1,173 @@
+import math
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtGui import QPainterPath, QPolygonF
+
+from radarcore.coveragePlanner import circle_bounds, plan_coverage
+from radarcore.geojsonLoader import GeoJsonLoader
+from radarcore.mapCompiler import compile_lines, format_stats
+from radarcore.projection import AzimuthalEquidistant, MAX_RANGE_NM
+
+
+class CompiledMap:
+    """Everything the display needs for one TRACON, worked out off the GUI thread."""
+
+    def __init__(self, tracon_id, config, loader, projection, lines, coverage, stats=None, polygons=(), points=()):
+        self.tracon_id = tracon_id
+        self.config = config
+        self.loader = loader
+        self.projection = projection
+        self.lines = lines  # Stitched video map polylines as QPolygonF in projected coordinates
+        self.coverage = coverage  # API query circles (lat, lon, radius_nm)
+        self.stats = stats or {}  # Before/after counts from the map compiler
+        self.polygons = polygons  # (colour or None, QPainterPath) per style, filled in one call each
+        self.points = points  # (QPointF, label or None) symbols in projected coordinates
+
+
+def project_lines(loader, projection, source_bytes=0):
+    """Compile the video map into stitched polylines, one drawPolyline each; returns (polylines, stats)."""
+    compiled = compile_lines(loader.get_lines(), loader.styles, projection, source_bytes)
+    lines = [
+        QPolygonF([QPointF(coords[i], coords[i + 1]) for i in range(0, len(coords), 2)])
+        for _, coords in compiled.polylines()
+    ]
+    return lines, compiled.stats
+
+
+def project_polygons(loader, projection):
+    """Build one fill path per style, so Qt tessellates each style's polygons in a single drawPath.
+
+    Rings are rewound so outlines run one way and holes the other, which lets
+    a winding fill cut the holes even where polygons of a style overlap.
+    """
+    forward = projection.forward
+    paths = {}
+    for style_id, rings in loader.get_polygons().polygons():
+        path = paths.get(style_id)
+        if path is None:
+            path = paths[style_id] = QPainterPath()
+            path.setFillRule(Qt.WindingFill)
+        for ring_index, coords in enumerate(rings):
+            points = [forward(coords[i + 1], coords[i]) for i in range(0, len(coords), 2)]
+            if len(points) < 3 or None in points:
+                if ring_index == 0:
+                    break  # Outline out of range, its holes mean nothing without it
+                continue
+            area = sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1]))
+            if (area > 0) != (ring_index == 0):
+                points.reverse()
+            path.addPolygon(QPolygonF([QPointF(x, y) for x, y in points]))
+            path.closeSubpath()
+    return [(loader.styles[style_id][0], path) for style_id, path in paths.items()]
+
+
+def project_points(loader, projection):
+    """Project point symbols and text labels; those out of range are dropped."""
+    points = loader.get_points()
+    forward = projection.forward
+    projected = []
+    for k, (_, coords) in enumerate(points.parts()):
+        point = forward(coords[1], coords[0])
+        if point is not None:
+            projected.append((QPointF(*point), points.labels[k]))
+    return projected
+
+
+def compile_map(tracon_id, config):
+    """Parse, project and plan coverage for one TRACON config."""
+    lat, lon = config["radar_settings"]["lat_lon"]
+    projection = AzimuthalEquidistant(lat, lon)
+    # Nothing past the projection's range is drawn, so it needn't be loaded either
+    loader = GeoJsonLoader()
+    loader.load_file(config["geojson_file"], bbox=circle_bounds(lat, lon, MAX_RANGE_NM))
+    lines, stats = project_lines(loader, projection, os.path.getsize(config["geojson_file"]))
+    print(f"Compiled {tracon_id} video map: {format_stats(stats)}")
+    return CompiledMap(
+        tracon_id, config, loader, projection, lines, plan_coverage(config, loader), stats,
+        project_polygons(loader, projection), project_points(loader, projection),
+    )
+
+
+class MapCache:
+    """Bounded LRU of compiled TRACON maps, compiled and preloaded on a background thread.
+
+    get() returns straight from the cache, waits for a preload already under
+    way, or compiles on the calling thread. The least recently used map is
+    dropped once more than capacity are held.
+    """
+
+    def __init__(self, tracon_configs, capacity=4):
+        self.tracon_configs = tracon_configs
+        self.capacity = capacity
+        self._entries = OrderedDict()  # tracon id -> Future of CompiledMap, most recent last
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="map-preload")
+
+    def __contains__(self, tracon_id):
+        return tracon_id in self._entries
+
+    def get(self, tracon_id):
+        """The compiled map for tracon_id; raises whatever loading it raised."""
+        with self._lock:
+            future = self._entries.get(tracon_id)
+            if future is not None:
+                self._entries.move_to_end(tracon_id)
+        if future is None:
+            # Compile here rather than queue behind preloads of other facilities
+            future = Future()
+            future.set_result(compile_map(tracon_id, self.tracon_configs[tracon_id]))
+            self._store(tracon_id, future)
+        try:
+            return future.result()
+        except Exception:
+            with self._lock:
+                self._entries.pop(tracon_id, None)  # Let the next attempt retry
+            raise
+
+    def request(self, tracon_id):
+        """A Future of the compiled map for tracon_id, compiled in the background if not cached."""
+        self._submit(tracon_id)
+        with self._lock:
+            future = self._entries.get(tracon_id)
+            if future is not None:
+                self._entries.move_to_end(tracon_id)
+                return future
+        return self._executor.submit(compile_map, tracon_id, self.tracon_configs[tracon_id])
+
+    def preload(self, tracon_ids):
+        """Start compiling maps in the background without waiting for them."""
+        for tracon_id in tracon_ids:
+            if tracon_id in self.tracon_configs:
+                self._submit(tracon_id)
+
+    def neighbours(self, tracon_id, count=2):
+        """The count facilities whose radars are closest to tracon_id's."""
+        lat, lon = self.tracon_configs[tracon_id]["radar_settings"]["lat_lon"]
+        kx = math.cos(math.radians(lat))
+
+        def distance(other):
+            other_lat, other_lon = self.tracon_configs[other]["radar_settings"]["lat_lon"]
+            return (other_lat - lat) ** 2 + ((other_lon - lon) * kx) ** 2
+
+        others = [other for other in self.tracon_configs if other != tracon_id]
+        return sorted(others, key=distance)[:count]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, tracon_id):
+        with self._lock:
+            if tracon_id in self._entries:
+                return
+        self._store(tracon_id, self._executor.submit(compile_map, tracon_id, self.tracon_configs[tracon_id]))
+
+    def _store(self, tracon_id, future):
+        with self._lock:
+            self._entries[tracon_id] = future
+            self._entries.move_to_end(tracon_id)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
@@ -0,0 +1,105 @@
+import time
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from radarcore.trackHistory import TrackHistoryStore, STALE_AFTER
+
+
+class PlaybackSource(QObject):
+    """Replays recorded history into a SnapshotBuffer like a live source would.
+
+    seek() restores the picture from the nearest keyframe before the target
+    time and rolls forward only the reports since then, so jumping anywhere in
+    a day of history costs a couple of indexed queries. Runs on the GUI thread
+    off a QTimer; each tick advances simulated time by the elapsed wall time
+    times the playback speed.
+    """
+
+    snapshot_ready = pyqtSignal()
+    position_changed = pyqtSignal(float)  # Simulated unix time now on screen
+
+    def __init__(self, snapshots, path, tick_ms=200, parent=None):
+        super().__init__(parent)
+        self.snapshots = snapshots
+        self.store = TrackHistoryStore(path)
+        self.speed = 1.0
+        self.position = None
+        self._aircraft = {}  # hex -> newest report row (ts, hex, flight, lat, lon, alt, gs, track, ground, squawk, type)
+        self._last_tick = None
+        self._end = None  # Last recorded time as of the previous time_range() call
+        self.timer = QTimer(self)
+        self.timer.setInterval(tick_ms)
+        self.timer.timeout.connect(self._tick)
+
+    def time_range(self):
+        """(first, last) recorded unix times, or (None, None) for an empty recording."""
+        first, last = self.store.time_range()
+        self._end = last
+        return first, last
+
+    def is_playing(self):
+        return self.timer.isActive()
+
+    def play(self):
+        if self.position is None:
+            first, _ = self.time_range()
+            if first is None:
+                return
+            self.seek(first)
+        self._last_tick = time.monotonic()
+        self.timer.start()
+
+    def pause(self):
+        self.timer.stop()
+
+    def set_speed(self, speed):
+        self.speed = speed
+
+    def seek(self, position):
+        """Jump to a unix time and publish the traffic picture as it was then."""
+        keyframe_ts, rows = self.store.keyframe_before(position)
+        if keyframe_ts is None:
+            keyframe_ts = position - STALE_AFTER
+        self._aircraft = {row[1]: row for row in rows}
+        self._apply(self.store.latest_between(keyframe_ts, position))
+        self.position = position
+        self._last_tick = time.monotonic()
+        self._publish()
+
+    def stop(self):
+        self.timer.stop()
+        self.store.close()
+
+    def _tick(self):
+        now = time.monotonic()
+        target = self.position + (now - self._last_tick) * self.speed
+        self._last_tick = now
+        last = self._end
+        if last is None or target >= last:
+            _, last = self.time_range()  # Only ask again near the end, the recording may have grown
+        if last is not None and target >= last:
+            target = last
+            self.timer.stop()  # Caught up with the end of the recording
+        self._apply(self.store.latest_between(self.position, target))
+        self.position = target
+        self._publish()
+
+    def _apply(self, rows):
+        aircraft = self._aircraft
+        for row in rows:
+            aircraft[row[1]] = row
+
+    def _publish(self):
+        position = self.position
+        oldest = position - STALE_AFTER
+        for key in [key for key, row in self._aircraft.items() if row[0] < oldest]:
+            del self._aircraft[key]
+
+        with self.snapshots.writing(position) as table:
+            for ts, hex_id, flight, lat, lon, alt, gs, track, ground, squawk, ac_type in self._aircraft.values():
+                table.set_row(
+                    table.row_for(hex_id, position - ts), hex_id, flight, lat, lon, "ground" if ground else alt, gs, track,
+                    None, None, ac_type, squawk, position - ts,
+                )
+        self.snapshot_ready.emit()
+        self.position_changed.emit(position)
@@ -0,0 +1,17 @@
+"""Qt-free radar core: ingest, tracks, filters, projection, video maps and geo helpers.
+
+Nothing in this package imports Qt, so it runs in batch analysis, tests and
+server processes as well as under RadarMain, which is a view over it. The
+network and disk pipeline modules (fetchEngine, receiverIngest, trackServer,
+trackHistory, trackExport) are imported where they are used, to keep importing
+the package cheap.
+"""
+from .aircraftTable import AircraftTable, SnapshotBuffer
+from .geo import assign_sector, haversine, predict_position
+from .geojsonLoader import GeoJsonLoader
+from .prediction import PredictionCache
+from .projection import AzimuthalEquidistant
+from .signals import Signal
+from .trafficCore import TrafficCore
+from .trafficFilter import TrafficFilter
+from .trailStore import TrailStore
@@ -0,0 +1,195 @@
+import math
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+NAN = math.nan
+
+# Numeric columns are stored as doubles with NaN for "not reported"
+NUMERIC_FIELDS = ("lat", "lon", "alt", "gs", "track", "mag_heading", "seen_pos")
+TEXT_FIELDS = ("hex", "flight", "emergency", "type", "squawk")
+
+
+class AircraftTable:
+    """Column-oriented aircraft reports whose storage is reused from poll to poll."""
+
+    def __init__(self, capacity=256):
+        self.size = 0
+        self.capacity = capacity
+        for name in NUMERIC_FIELDS:
+            setattr(self, name, array("d", [NAN]) * capacity)
+        for name in TEXT_FIELDS:
+            setattr(self, name, [None] * capacity)
+        self.ground = bytearray(capacity)  # 1 when the aircraft reports "ground" altitude
+        self.index = {}  # hex -> row, so reports from overlapping sources merge in O(1)
+        self.visible = []  # Rows that passed the traffic filter, set when published
+        self.scope_visible = {}  # scope -> rows passing that scope's own filter, set when published
+        self.timestamp = 0.0  # Unix time the table was published
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        """Forget every row but keep the allocated columns."""
+        self.size = 0
+        self.index.clear()
+        self.visible = []
+        self.scope_visible = {}
+
+    def _grow(self):
+        extra = self.capacity
+        for name in NUMERIC_FIELDS:
+            getattr(self, name).extend(array("d", [NAN]) * extra)
+        for name in TEXT_FIELDS:
+            getattr(self, name).extend([None] * extra)
+        self.ground.extend(bytes(extra))
+        self.capacity += extra
+
+    def new_row(self):
+        """Reserve the next row and return its index."""
+        if self.size == self.capacity:
+            self._grow()
+        i = self.size
+        self.size += 1
+        return i
+
+    def row_for(self, hex_id, seen_pos):
+        """Row to write a report for hex_id into, or None if a fresher one is already held."""
+        if hex_id is not None:
+            i = self.index.get(hex_id)
+            if i is not None:
+                if not _age(seen_pos) < _age(self.seen_pos[i]):
+                    return None
+                return i
+        i = self.new_row()
+        if hex_id is not None:
+            self.index[hex_id] = i
+        return i
+
+    def set_row(self, i, hex_id, flight, lat, lon, alt, gs, track, mag_heading, emergency, ac_type, squawk, seen_pos):
+        """Overwrite row i. Raw values are normalised: numbers to float or NaN, "ground" to the flag."""
+        self.hex[i] = hex_id
+        self.flight[i] = flight
+        self.emergency[i] = emergency
+        self.type[i] = ac_type
+        self.squawk[i] = squawk
+        self.lat[i] = _number(lat)
+        self.lon[i] = _number(lon)
+        if alt == "ground":
+            self.ground[i] = 1
+            self.alt[i] = NAN
+        else:
+            self.ground[i] = 0
+            self.alt[i] = _number(alt)
+        self.gs[i] = _number(gs)
+        self.track[i] = _number(track)
+        self.mag_heading[i] = _number(mag_heading)
+        self.seen_pos[i] = _number(seen_pos)
+
+    def append(self, report):
+        """Add or merge one report dict in the shape produced by fetchEngine.parse_aircraft."""
+        seen_pos = _number(report.get("seen_pos"))
+        i = self.row_for(report.get("hex"), seen_pos)
+        if i is None:
+            return None
+        self.set_row(
+            i, report.get("hex"), report.get("flight"), report.get("lat"), report.get("lon"),
+            report.get("alt"), report.get("gs"), report.get("track"), report.get("mag_heading"),
+            report.get("emergency"), report.get("type"), report.get("squawk"), seen_pos,
+        )
+        return i
+
+    def extend(self, reports):
+        for report in reports:
+            self.append(report)
+
+
+def _number(value):
+    """Coerce a reported value to float, NaN when missing or not numeric."""
+    if value is None:
+        return NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def _age(seen_pos):
+    """Seconds since the last position; a report without one counts as oldest."""
+    return math.inf if seen_pos != seen_pos else seen_pos
+
+
+class SnapshotBuffer:
+    """Triple buffer handing aircraft tables from an ingest thread to the GUI thread.
+
+    The ingest thread fills the spare table inside writing() and publishes it
+    on exit, or fills a table of its own and publishes it with exchange(). The
+    GUI thread calls swap() when notified, which flips the latest published
+    table to the front. Only swap() changes which table is in front, so the GUI
+    can read front() during paint without copying or locking. The lock is only
+    held to hand a table over, never while one is being filled, and the table
+    being filled is neither on screen nor the one waiting to go there.
+    """
+
+    def __init__(self, capacity=256, traffic_filter=None):
+        self._tables = [AircraftTable(capacity), AircraftTable(capacity), AircraftTable(capacity)]
+        self.traffic_filter = traffic_filter  # Applied on the ingest thread at publish time
+        self.scope_filters = {}  # scope -> TrafficFilter, for displays sharing this buffer
+        self.sinks = []  # Objects with submit(table), e.g. the history writer, fed at publish time
+        self._front = 0
+        self._back = 1  # The latest published table while _pending, otherwise free
+        self._spare = 2  # Only ever touched by the ingest thread
+        self._pending = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def writing(self, timestamp=None):
+        """Ingest thread: yield the cleared spare table and publish it afterwards.
+
+        The table is stamped with timestamp, or the wall clock if None; a replay
+        passes its simulated time so consumers age and sample against that.
+        """
+        table = self._tables[self._spare]
+        table.clear()
+        yield table  # A fill that raises is never published
+        self._prepare(table, timestamp)
+        with self._lock:
+            self._spare, self._back = self._back, self._spare
+            self._pending = True
+
+    def exchange(self, table):
+        """Ingest thread: publish a fully written table and get the unshown one it replaces to reuse.
+
+        Lets a source fill its table at leisure, without holding the lock, and
+        still hand it over without copying.
+        """
+        self._prepare(table)
+        with self._lock:
+            previous = self._tables[self._back]
+            self._tables[self._back] = table
+            self._pending = True
+        return previous
+
+    def _prepare(self, table, timestamp=None):
+        """Stamp, filter and record a table on the ingest thread just before it goes live."""
+        table.timestamp = time.time() if timestamp is None else timestamp
+        if self.traffic_filter is not None:
+            self.traffic_filter.apply(table)
+        else:
+            table.visible = list(range(table.size))
+        table.scope_visible = {scope: f.select(table) for scope, f in list(self.scope_filters.items())}
+        for sink in self.sinks:
+            sink.submit(table)
+
+    def swap(self):
+        """GUI thread: bring the newest published table to the front and return it."""
+        with self._lock:
+            if self._pending:
+                self._front, self._back = self._back, self._front
+                self._pending = False
+        return self._tables[self._front]
+
+    def front(self):
+        """GUI thread: the table currently on screen."""
+        return self._tables[self._front]
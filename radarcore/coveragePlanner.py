@@ -0,0 +1,127 @@
+import math
+
+MAX_QUERY_RADIUS_NM = 250  # Largest dist the adsb.lol API accepts
+NM_PER_DEGREE = 60.0
+COVERAGE_MARGIN_NM = 30  # Extra coverage around the video map for arriving traffic
+
+
+def circle_bounds(lat, lon, dist):
+    """Bounding box (min_lon, min_lat, max_lon, max_lat) of a circle of dist nm."""
+    dlat = dist / NM_PER_DEGREE
+    dlon = dist / (NM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return lon - dlon, lat - dlat, lon + dlon, lat + dlat
+
+
+def pad_bounds(bounds, margin):
+    """Grow a bounding box by margin nm on every side."""
+    min_lon, min_lat, max_lon, max_lat = bounds
+    mid_lat = (min_lat + max_lat) / 2
+    dlat = margin / NM_PER_DEGREE
+    dlon = margin / (NM_PER_DEGREE * max(math.cos(math.radians(mid_lat)), 0.01))
+    return min_lon - dlon, min_lat - dlat, max_lon + dlon, max_lat + dlat
+
+
+def plan_circles(area, max_radius=MAX_QUERY_RADIUS_NM):
+    """Cover a bounding box or polygon with as few query circles as practical.
+
+    area is either a (min_lon, min_lat, max_lon, max_lat) box or a list of
+    (lon, lat) polygon vertices. Returns a list of (lat, lon, dist) circles
+    with dist in whole nautical miles, never more than max_radius.
+    """
+    if len(area) == 4 and not isinstance(area[0], (list, tuple)):
+        min_lon, min_lat, max_lon, max_lat = area
+        polygon = [(min_lon, min_lat), (max_lon, min_lat), (max_lon, max_lat), (min_lon, max_lat)]
+    else:
+        polygon = [tuple(p) for p in area]
+        min_lon = min(p[0] for p in polygon)
+        max_lon = max(p[0] for p in polygon)
+        min_lat = min(p[1] for p in polygon)
+        max_lat = max(p[1] for p in polygon)
+
+    # Work in a flat local frame (nm) around the centre of the box. The
+    # longitude scale is taken at the latitude nearest the equator so that
+    # flat distances never understate real ones and coverage stays complete.
+    lat0 = (min_lat + max_lat) / 2
+    lon0 = (min_lon + max_lon) / 2
+    widest_lat = 0.0 if min_lat <= 0 <= max_lat else min(abs(min_lat), abs(max_lat))
+    kx = NM_PER_DEGREE * math.cos(math.radians(widest_lat))
+    local = [((lon - lon0) * kx, (lat - lat0) * NM_PER_DEGREE) for lon, lat in polygon]
+    half_w = (max_lon - min_lon) * kx / 2
+    half_h = (max_lat - min_lat) * NM_PER_DEGREE / 2
+
+    # Small areas fit in a single circle around the centre
+    half_diagonal = math.hypot(half_w, half_h)
+    if half_diagonal <= max_radius:
+        return [(lat0, lon0, max(1, math.ceil(half_diagonal)))]
+
+    # Otherwise lay a hexagonal lattice of circles over the box, in both
+    # orientations, and keep whichever needs fewer circles touching the area
+    best = None
+    for transpose in (False, True):
+        w, h = (half_h, half_w) if transpose else (half_w, half_h)
+        centres = []
+        for x, y in _hex_lattice(w, h, max_radius):
+            if transpose:
+                x, y = y, x
+            if _circle_touches_polygon(x, y, max_radius, local):
+                centres.append((x, y))
+        if best is None or len(centres) < len(best):
+            best = centres
+
+    return [
+        (lat0 + y / NM_PER_DEGREE, lon0 + x / kx, max_radius)
+        for x, y in best
+    ]
+
+
+def plan_coverage(config, loader):
+    """Work out the API query circles covering a TRACON."""
+    # An explicit [min_lon, min_lat, max_lon, max_lat] box in the config wins,
+    # otherwise cover the video map's extent plus a margin for arrivals
+    radar_lat, radar_lon = config["radar_settings"]["lat_lon"]
+    area = config["radar_settings"].get("coverage")
+    if area is None:
+        map_bounds = loader.bounds()
+        if map_bounds is None:
+            return [(radar_lat, radar_lon, 100)]
+        area = pad_bounds(map_bounds, COVERAGE_MARGIN_NM)
+    return plan_circles(area)
+
+
+def _hex_lattice(half_w, half_h, radius):
+    """Centres of a hexagonal circle lattice covering [-half_w, half_w] x [-half_h, half_h]."""
+    dx = math.sqrt(3) * radius
+    dy = 1.5 * radius
+    rows = math.ceil(half_h / dy) + 1
+    cols = math.ceil(half_w / dx) + 1
+    for row in range(-rows, rows + 1):
+        shift = dx / 2 if row % 2 else 0.0
+        for col in range(-cols, cols + 1):
+            yield col * dx + shift, row * dy
+
+
+def _circle_touches_polygon(cx, cy, radius, polygon):
+    """True if a circle overlaps a polygon given in the same flat frame."""
+    if _point_in_polygon(cx, cy, polygon):
+        return True
+    r2 = radius * radius
+    for i in range(len(polygon)):
+        ax, ay = polygon[i - 1]
+        bx, by = polygon[i]
+        abx, aby = bx - ax, by - ay
+        length2 = abx * abx + aby * aby
+        t = 0.0 if length2 == 0 else max(0.0, min(1.0, ((cx - ax) * abx + (cy - ay) * aby) / length2))
+        px, py = ax + t * abx - cx, ay + t * aby - cy
+        if px * px + py * py <= r2:
+            return True
+    return False
+
+
+def _point_in_polygon(x, y, polygon):
+    inside = False
+    for i in range(len(polygon)):
+        ax, ay = polygon[i - 1]
+        bx, by = polygon[i]
+        if (ay > y) != (by > y) and x < ax + (y - ay) * (bx - ax) / (by - ay):
+            inside = not inside
+    return inside
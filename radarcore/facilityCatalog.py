@@ -0,0 +1,137 @@
+import json
+import math
+import os
+from collections import Counter
+
+from .geojsonLoader import STYLE_KEYS, GeoJsonLoader, read_features
+from .projection import UNITS_PER_NM
+
+DEFAULT_MAP_DIR = os.path.join("Resources", "tracons")
+DEFAULT_CATALOG_PATH = os.path.join(os.path.expanduser("~"), ".radarview", "catalog.json")
+FIT_PIXELS = 800  # Auto-centred maps are scaled so their larger side spans about this many pixels
+
+
+def describe_map(path):
+    """Metadata for one GeoJSON video map: extent, counts, palette and centre."""
+    palette = {key: Counter() for key in STYLE_KEYS}
+    members = {}
+    # Streamed into the loader's typed arrays, which split every geometry type
+    # into lines, rings and points, so no feature dict outlives its own step
+    loader = GeoJsonLoader()
+    for feature in read_features(path, members):
+        loader.add_feature(feature)
+        properties = feature.get("properties") or {}
+        for key in STYLE_KEYS:
+            if properties.get(key) is not None:
+                palette[key][str(properties[key])] += 1
+
+    min_lon = min_lat = math.inf
+    max_lon = max_lat = -math.inf
+    vertices = 0
+    for arrays in (loader.lines, loader.polygons, loader.points):
+        coords = arrays.coords
+        vertices += len(coords) // 2
+        for i in range(0, len(coords), 2):
+            lon, lat = coords[i], coords[i + 1]
+            # Skip the null-island placeholder points some video maps carry
+            if lon == 0 and lat == 0:
+                continue
+            min_lon = min(min_lon, lon)
+            max_lon = max(max_lon, lon)
+            min_lat = min(min_lat, lat)
+            max_lat = max(max_lat, lat)
+
+    bbox = [min_lon, min_lat, max_lon, max_lat] if min_lon <= max_lon else None
+    return {
+        "name": members.get("name"),
+        "features": loader.feature_count,
+        "vertices": vertices,
+        "bbox": bbox,
+        "center": [(min_lat + max_lat) / 2, (min_lon + max_lon) / 2] if bbox else None,
+        "palette": {key: dict(counts.most_common()) for key, counts in palette.items() if counts},
+    }
+
+
+class FacilityCatalog:
+    """Metadata of every video map in a folder, cached on disk and refreshed by file mtime.
+
+    Only maps added or changed since the last refresh are parsed, so listing,
+    searching and auto-centring hundreds of facilities costs a directory scan.
+    """
+
+    def __init__(self, map_dir=DEFAULT_MAP_DIR, cache_path=DEFAULT_CATALOG_PATH):
+        self.map_dir = map_dir
+        self.cache_path = cache_path
+        self.entries = {}  # facility id -> metadata dict from describe_map plus file, mtime and size
+
+    def refresh(self):
+        """Bring the catalog in line with the folder; returns the facility ids that were (re)parsed."""
+        cached = self._load()
+        entries = {}
+        parsed = []
+        for filename in sorted(os.listdir(self.map_dir)):
+            if not filename.endswith(".geojson"):
+                continue
+            facility_id = filename[:-len(".geojson")]
+            path = os.path.join(self.map_dir, filename)
+            stat = os.stat(path)
+            entry = cached.get(facility_id)
+            if entry is None or entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+                try:
+                    entry = describe_map(path)
+                except (OSError, ValueError) as e:
+                    print(f"Skipping unreadable map {filename}: {e}")
+                    continue
+                entry.update(file=path, mtime=stat.st_mtime, size=stat.st_size)
+                parsed.append(facility_id)
+            entries[facility_id] = entry
+
+        self.entries = entries
+        if parsed or entries.keys() != cached.keys():
+            self._save()
+        return parsed
+
+    def ids(self):
+        return sorted(self.entries)
+
+    def search(self, text):
+        """Facility ids whose id or map name contains text, ignoring case."""
+        text = text.strip().lower()
+        return [
+            facility_id for facility_id in self.ids()
+            if text in facility_id.lower() or text in (self.entries[facility_id].get("name") or "").lower()
+        ]
+
+    def config_for(self, facility_id):
+        """A TRACON config centred on and scaled to the map's extent, for facilities not in .TraconConfig.
+
+        Returns None for a map with no geometry to centre on.
+        """
+        entry = self.entries[facility_id]
+        center = entry["center"]
+        if center is None:
+            return None
+        min_lon, min_lat, max_lon, max_lat = entry["bbox"]
+        width_nm = (max_lon - min_lon) * 60 * math.cos(math.radians(center[0]))
+        height_nm = (max_lat - min_lat) * 60
+        extent = max(width_nm, height_nm) * UNITS_PER_NM
+        scale = min(max(FIT_PIXELS / extent, 0.1), 4.0) if extent > 0 else 1.0
+        return {
+            "tracon_name": f"{facility_id} ({entry.get('name') or 'auto-centred'})",
+            "geojson_file": entry["file"],
+            "radar_settings": {"center": [400, 400], "scale_factor": scale, "lat_lon": center},
+        }
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "r") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # A catalog built for another folder is no use
+        return cached.get("entries", {}) if cached.get("map_dir") == os.path.abspath(self.map_dir) else {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        with open(self.cache_path, "w") as f:
+            json.dump({"map_dir": os.path.abspath(self.map_dir), "entries": self.entries}, f)
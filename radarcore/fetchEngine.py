@@ -0,0 +1,264 @@
+import asyncio
+import ssl
+import threading
+import time
+from urllib.parse import urlsplit
+from .aircraftTable import AircraftTable
+from .signals import Signal
+from .streamJson import JsonArrayStream
+
+API_URL = "https://api.adsb.lol/v2/lat/{lat}/lon/{lon}/dist/{dist}"
+
+
+def parse_aircraft(aircraft_list):
+    """Map the raw API aircraft entries to the fields used by the display."""
+    parsed_data = []
+    for ac in aircraft_list:
+        parsed_data.append({
+            'hex': ac.get('hex'),
+            'flight': ac.get('flight'),
+            'lat': ac.get('lat'),
+            'lon': ac.get('lon'),
+            'alt': ac.get('alt_baro'),  # Altitude in Barometric
+            'gs': ac.get('gs'),  # Ground speed
+            'track': ac.get('track'),
+            'mag_heading': ac.get('mag_heading'),
+            'emergency': ac.get('emergency'),
+            'type': ac.get('t'),
+            'squawk': ac.get('squawk'),
+            'seen_pos': ac.get('seen_pos')  # Seconds since the last position update
+        })
+    return parsed_data
+
+
+def project_aircraft(table, ac):
+    """Write the fields the display uses from one raw API entry straight into the table."""
+    seen_pos = ac.get('seen_pos')
+    i = table.row_for(ac.get('hex'), float('nan') if seen_pos is None else seen_pos)
+    if i is None:
+        return  # A fresher report from an overlapping circle is already held
+    table.set_row(
+        i, ac.get('hex'), ac.get('flight'), ac.get('lat'), ac.get('lon'), ac.get('alt_baro'),
+        ac.get('gs'), ac.get('track'), ac.get('mag_heading'), ac.get('emergency'),
+        ac.get('t'), ac.get('squawk'), seen_pos,
+    )
+
+
+async def iter_http_body(reader, headers):
+    """Yield the response body in chunks, handling chunked and sized bodies."""
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                await reader.readline()  # Trailing CRLF after the last chunk
+                return
+            yield await reader.readexactly(size)
+            await reader.readline()
+    elif "content-length" in headers:
+        remaining = int(headers["content-length"])
+        while remaining > 0:
+            chunk = await reader.read(min(remaining, 65536))
+            if not chunk:
+                raise ConnectionError("Connection closed before the body was complete")
+            remaining -= len(chunk)
+            yield chunk
+    else:
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                return
+            yield chunk
+
+
+async def open_http_get(url):
+    """Send a GET request and return (status, headers, reader, writer) once headers arrive."""
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+
+    reader, writer = await asyncio.open_connection(
+        parts.hostname, port, ssl=ssl.create_default_context() if secure else None
+    )
+    try:
+        request = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {parts.hostname}\r\n"
+            "User-Agent: RadarView\r\n"
+            "Accept: application/json\r\n"
+            "Accept-Encoding: identity\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(request.encode("ascii"))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+    except BaseException:
+        writer.close()
+        raise
+    return status, headers, reader, writer
+
+
+def _circle_outcome(task):
+    """(status, latency, retry_after) of a finished circle task; one that crashed counts as failed."""
+    if task.cancelled():
+        return 0, 0.0, 0.0
+    error = task.exception()
+    if error is not None:
+        print(f"Circle fetch failed: {error!r}")
+        return 0, 0.0, 0.0
+    return task.result()
+
+
+class FetchEngine(threading.Thread):
+    """Polls several query circles concurrently on an asyncio loop in its own thread."""
+
+    def __init__(self, circles, snapshots, max_concurrent=4, timeout=4.0):
+        super().__init__(name="fetch-engine", daemon=True)
+        self.snapshot_ready = Signal()  # A new table was published to the snapshot buffer
+        self.poll_finished = Signal()  # status, latency (s), retry-after (s)
+        self.circles = list(circles)  # (lat, lon, dist) tuples
+        self.snapshots = snapshots
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout  # Per-request deadline in seconds
+        self.loop = None
+        self._semaphore = None
+        self._poll_task = None
+        self._circle_tasks = []
+        self._staging = AircraftTable()  # Filled by the running poll, then exchanged
+
+    def run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self.loop = loop
+        try:
+            loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop = None
+            loop.close()
+
+    def set_circles(self, circles):
+        """Replace the query circles; takes effect on the next poll."""
+        self.circles = list(circles)
+
+    def poll(self):
+        """Start a poll of every circle from any thread. Skipped until the loop is running."""
+        loop = self.loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._start_poll)
+
+    def stop(self):
+        """Stop the event loop, cancelling anything in flight, and wait for the thread."""
+        loop = self.loop
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        if self.is_alive():
+            self.join()
+
+    def _start_poll(self):
+        # A poll still running when the next one starts is stale: drop it. Its
+        # circle tasks are cancelled here too so none of them can write into the
+        # staging table after the new poll has cleared it.
+        if self._poll_task is not None and not self._poll_task.done():
+            self._poll_task.cancel()
+            for task in self._circle_tasks:
+                task.cancel()
+        self._staging.clear()
+        self._circle_tasks = [
+            self.loop.create_task(self._fetch_circle(circle, self._staging))
+            for circle in self.circles
+        ]
+        self._poll_task = self.loop.create_task(self._poll_all(self._circle_tasks))
+
+    async def _poll_all(self, tasks):
+        # Reported however the poll fails, so the scheduler never has to wait for its watchdog.
+        # A poll cancelled because a newer one replaced it isn't a failure and isn't reported
+        outcome = (0, 0.0, 0.0)
+        try:
+            if not tasks:
+                outcome = (200, 0.0, 0.0)
+                return
+            await asyncio.wait(tasks)
+            results = [_circle_outcome(task) for task in tasks]
+
+            # Overlapping circles were already merged by hex while streaming in
+            self._staging = self.snapshots.exchange(self._staging)
+            self.snapshot_ready.emit()
+
+            # Report the worst outcome of the poll so the scheduler can back off
+            statuses = [status for status, _, _ in results]
+            failed = [s for s in statuses if s == 0 or s == 429 or s >= 500]
+            outcome = (
+                max(failed) if failed else max(statuses),
+                max(latency for _, latency, _ in results),
+                max(retry_after for _, _, retry_after in results),
+            )
+        except asyncio.CancelledError:
+            outcome = None
+            raise
+        finally:
+            if outcome is not None:
+                self.poll_finished.emit(*outcome)
+
+    async def _fetch_circle(self, circle, table):
+        """Stream one circle into the table, returning (status, latency, retry_after)."""
+        lat, lon, dist = circle
+        url = API_URL.format(lat=lat, lon=lon, dist=dist)
+        async with self._semaphore:
+            started = time.monotonic()
+            try:
+                status, headers, count = await asyncio.wait_for(self._stream_circle(url, table), self.timeout)
+            except asyncio.TimeoutError:
+                # Aircraft decoded before the deadline stay in the table
+                print(f"Timed out after {self.timeout}s fetching {url}")
+                return 0, self.timeout, 0.0
+            except (OSError, EOFError, ValueError, IndexError) as e:
+                # EOFError: asyncio.IncompleteReadError, the body was cut short
+                print(f"Error fetching {url}: {e}")
+                return 0, time.monotonic() - started, 0.0
+            latency = time.monotonic() - started
+
+        if status != 200:
+            print(f"Error: Received status code {status} from {url}")
+            try:
+                retry_after = float(headers.get("retry-after", 0))
+            except ValueError:
+                retry_after = 0.0  # HTTP-date form, let the backoff decide
+            return status, latency, retry_after
+
+        print(f"Fetched {count} aircraft from {url} in {latency:.2f}s")
+        return status, latency, 0.0
+
+    async def _stream_circle(self, url, table):
+        """Decode the response's ac array element by element as the body arrives."""
+        status, headers, reader, writer = await open_http_get(url)
+        try:
+            count = 0
+            if status == 200:
+                stream = JsonArrayStream("ac")
+                async for chunk in iter_http_body(reader, headers):
+                    for ac in stream.feed(chunk):
+                        project_aircraft(table, ac)
+                        count += 1
+                for ac in stream.close():
+                    project_aircraft(table, ac)
+                    count += 1
+            return status, headers, count
+        finally:
+            writer.close()
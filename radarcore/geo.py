@@ -0,0 +1,48 @@
+import math
+
+EARTH_RADIUS_M = 6371000
+KNOTS_TO_MPS = 0.514444
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Calculate the distance in meters between two lat/lon points."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    delta_phi = math.radians(lat2 - lat1)
+    delta_lambda = math.radians(lon2 - lon1)
+
+    a = math.sin(delta_phi / 2) * math.sin(delta_phi / 2) + \
+        math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) * math.sin(delta_lambda / 2)
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return EARTH_RADIUS_M * c
+
+
+def predict_position(lat, lon, heading, speed, minutes=1):
+    """Great-circle (lat, lon) reached after minutes at speed knots on heading degrees."""
+    distance = speed * KNOTS_TO_MPS * 60 * minutes
+    angle = distance / EARTH_RADIUS_M
+    heading_rad = math.radians(heading)
+    lat_rad = math.radians(lat)
+    lon_rad = math.radians(lon)
+
+    predicted_lat_rad = math.asin(
+        math.sin(lat_rad) * math.cos(angle) +
+        math.cos(lat_rad) * math.sin(angle) * math.cos(heading_rad)
+    )
+    predicted_lon_rad = lon_rad + math.atan2(
+        math.sin(heading_rad) * math.sin(angle) * math.cos(lat_rad),
+        math.cos(angle) - math.sin(lat_rad) * math.sin(predicted_lat_rad)
+    )
+    return math.degrees(predicted_lat_rad), math.degrees(predicted_lon_rad)
+
+
+def assign_sector(lat, lon, alt):
+    """Assign aircraft to a TRACON sector based on position or altitude."""
+    if alt < 10000:
+        return "F"
+    elif alt < 20000:
+        return "V"
+    elif alt < 30000:
+        return "A"
+    else:
+        return "H"
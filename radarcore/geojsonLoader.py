@@ -0,0 +1,249 @@
+# GeoJson Loader to load GeoJSON data
+from array import array
+
+from .streamJson import JsonArrayStream
+
+STYLE_KEYS = ("color", "style", "thickness")  # Feature properties that select how a geometry is drawn
+CHUNK_SIZE = 1 << 16  # Bytes read at a time when streaming a map from disk
+
+
+def read_features(path, members=None, chunk_size=CHUNK_SIZE):
+    """Yield the features of a GeoJSON file one at a time without parsing the whole document.
+
+    The collection's other top-level members (name, type, ...) are put in
+    members, if given, once the file has been read.
+    """
+    stream = JsonArrayStream("features")
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            yield from stream.feed(chunk)
+        yield from stream.close()
+    if members is not None:
+        members.update(stream.members)
+
+
+class GeometryArrays:
+    """Every part of one geometry kind as flat lon, lat arrays, built once at load time.
+
+    Part k is coords[2 * starts[k]:2 * starts[k + 1]] and is drawn with
+    loader.styles[style_ids[k]]. A part is a line for lines, a ring for
+    polygons and a single position for points.
+    """
+
+    def __init__(self):
+        self.coords = array("d")
+        self.starts = array("I", [0])
+        self.style_ids = array("H")
+
+    def __len__(self):
+        return len(self.style_ids)
+
+    def add(self, positions, style_id):
+        coords = self.coords
+        for position in positions:
+            coords.append(position[0])
+            coords.append(position[1])
+        self.starts.append(len(coords) // 2)
+        self.style_ids.append(style_id)
+
+    def part(self, k):
+        return self.coords[2 * self.starts[k]:2 * self.starts[k + 1]]
+
+    def parts(self):
+        """Yield (style id, [lon0, lat0, lon1, lat1, ...]) for every part."""
+        for k, style_id in enumerate(self.style_ids):
+            yield style_id, self.part(k)
+
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in (self.coords, self.starts, self.style_ids))
+
+
+class PolygonArrays(GeometryArrays):
+    """Polygon rings, grouped: polygon j is rings polygon_starts[j] to polygon_starts[j + 1]."""
+
+    def __init__(self):
+        super().__init__()
+        self.polygon_starts = array("I", [0])
+
+    def add_polygon(self, rings, style_id):
+        for ring in rings:
+            self.add(ring, style_id)
+        self.polygon_starts.append(len(self.style_ids))
+
+    def polygons(self):
+        """Yield (style id, [ring coords, ...]); the first ring is the outline, the rest are holes."""
+        starts = self.polygon_starts
+        for j in range(len(starts) - 1):
+            if starts[j] < starts[j + 1]:
+                yield self.style_ids[starts[j]], [self.part(k) for k in range(starts[j], starts[j + 1])]
+
+
+class PointArrays(GeometryArrays):
+    """Point symbols, with the label text of CRC text features (None for a plain symbol)."""
+
+    def __init__(self):
+        super().__init__()
+        self.labels = []
+
+    def add_point(self, position, style_id, label=None):
+        self.add((position,), style_id)
+        self.labels.append(label)
+
+
+class GeoJsonLoader:
+    """Typed geometry model of a video map: lines, polygons and points in flat arrays.
+
+    Multi* geometries and GeometryCollections are split into their members
+    at load time, so get_lines, get_polygons and get_points are O(1).
+    load_file streams features straight into the arrays and can drop whatever
+    lies outside a bounding box, so ARTCC-wide maps never exist as a dict.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.name = None
+        self.styles = []  # (color, style, thickness) property tuples, indexed by style id
+        self.lines = GeometryArrays()
+        self.polygons = PolygonArrays()
+        self.points = PointArrays()
+        self.feature_count = 0
+        self.skipped = 0  # Features with no geometry, or one of an unknown type
+        self.clipped = 0  # Segments, polygons and points dropped outside clip
+        self.clip = None  # (min_lon, min_lat, max_lon, max_lat) to keep, or None for everything
+        self._style_index = {}
+        self._bounds = None
+
+    def load(self, geojson_data, bbox=None):
+        self.clear()
+        self.clip = bbox
+        self.name = geojson_data.get("name")
+        for feature in geojson_data.get("features", []):
+            self.add_feature(feature)
+        self._bounds = self._line_bounds()
+
+    def load_file(self, path, bbox=None, chunk_size=CHUNK_SIZE):
+        """Stream a GeoJSON file in, keeping only geometry that overlaps bbox if one is given."""
+        self.clear()
+        self.clip = bbox
+        members = {}
+        for feature in read_features(path, members, chunk_size):
+            self.add_feature(feature)
+        self.name = members.get("name")
+        self._bounds = self._line_bounds()
+
+    def add_feature(self, feature):
+        self.feature_count += 1
+        properties = feature.get("properties") or {}
+        style = tuple(properties.get(key) for key in STYLE_KEYS)
+        style_id = self._style_index.get(style)
+        if style_id is None:
+            style_id = self._style_index[style] = len(self.styles)
+            self.styles.append(style)
+        if not self._add_geometry(feature.get("geometry"), style_id, self._label(properties)):
+            self.skipped += 1
+
+    def _add_geometry(self, geometry, style_id, label):
+        kind = geometry.get("type") if geometry else None
+        coordinates = geometry.get("coordinates") if geometry else None
+        if kind == "LineString":
+            self._add_line(coordinates, style_id)
+        elif kind == "MultiLineString":
+            for line in coordinates:
+                self._add_line(line, style_id)
+        elif kind == "Polygon":
+            self._add_polygon(coordinates, style_id)
+        elif kind == "MultiPolygon":
+            for rings in coordinates:
+                self._add_polygon(rings, style_id)
+        elif kind == "Point":
+            self._add_point(coordinates, style_id, label)
+        elif kind == "MultiPoint":
+            for position in coordinates:
+                self._add_point(position, style_id, label)
+        elif kind == "GeometryCollection":
+            added = [self._add_geometry(member, style_id, label) for member in geometry.get("geometries", [])]
+            return any(added)
+        else:
+            return False
+        return True
+
+    def _add_line(self, positions, style_id):
+        if self.clip is None:
+            self.lines.add(positions, style_id)
+            return
+        # Keep each run of segments whose extent overlaps the box, so a line
+        # leaving and re-entering it becomes two parts
+        min_lon, min_lat, max_lon, max_lat = self.clip
+        run = []
+        for start, end in zip(positions, positions[1:]):
+            if (max(start[0], end[0]) < min_lon or min(start[0], end[0]) > max_lon
+                    or max(start[1], end[1]) < min_lat or min(start[1], end[1]) > max_lat):
+                self.clipped += 1
+                if run:
+                    self.lines.add(run, style_id)
+                    run = []
+                continue
+            if not run:
+                run.append(start)
+            run.append(end)
+        if run:
+            self.lines.add(run, style_id)
+
+    def _add_polygon(self, rings, style_id):
+        if self.clip is not None and rings:
+            # Polygons are kept or dropped whole by their outline's extent
+            min_lon, min_lat, max_lon, max_lat = self.clip
+            lons = [position[0] for position in rings[0]]
+            lats = [position[1] for position in rings[0]]
+            if not lons or max(lons) < min_lon or min(lons) > max_lon or max(lats) < min_lat or min(lats) > max_lat:
+                self.clipped += 1
+                return
+        self.polygons.add_polygon(rings, style_id)
+
+    def _add_point(self, position, style_id, label):
+        if self.clip is not None:
+            min_lon, min_lat, max_lon, max_lat = self.clip
+            if not (min_lon <= position[0] <= max_lon and min_lat <= position[1] <= max_lat):
+                self.clipped += 1
+                return
+        self.points.add_point(position, style_id, label)
+
+    @staticmethod
+    def _label(properties):
+        # CRC text features carry their lines of text as a list
+        text = properties.get("text")
+        if isinstance(text, list):
+            text = "\n".join(str(line) for line in text)
+        return text or None
+
+    def get_lines(self):
+        return self.lines
+
+    def get_polygons(self):
+        return self.polygons
+
+    def get_points(self):
+        return self.points
+
+    def bounds(self):
+        """Return (min_lon, min_lat, max_lon, max_lat) of the line data, or None if empty."""
+        return self._bounds
+
+    def _line_bounds(self):
+        min_lon = min_lat = float("inf")
+        max_lon = max_lat = float("-inf")
+        coords = self.lines.coords
+        for i in range(0, len(coords), 2):
+            lon, lat = coords[i], coords[i + 1]
+            # Skip the null-island placeholder points some video maps carry
+            if lon == 0 and lat == 0:
+                continue
+            min_lon = min(min_lon, lon)
+            max_lon = max(max_lon, lon)
+            min_lat = min(min_lat, lat)
+            max_lat = max(max_lat, lat)
+        if min_lon > max_lon:
+            return None
+        return min_lon, min_lat, max_lon, max_lat
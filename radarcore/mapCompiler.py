@@ -0,0 +1,171 @@
+import sys
+from array import array
+
+QUANTUM = 8  # Fixed-point steps per radar unit, ~17 m at 13.3 units per nm
+
+
+class CompiledLines:
+    """Video map polylines as fixed-point integers relative to the facility centre.
+
+    coords holds x, y pairs of every polyline back to back in QUANTUM steps
+    per projected radar unit; polyline k is coords[2 * starts[k]:2 * starts[k + 1]]
+    and is drawn with styles[style_ids[k]].
+    """
+
+    def __init__(self):
+        self.coords = array("i")
+        self.starts = array("i", [0])
+        self.style_ids = array("H")
+        self.styles = []  # (color, style, thickness) property tuples
+        self.stats = {}
+
+    def __len__(self):
+        return len(self.style_ids)
+
+    def polylines(self):
+        """Yield (style, [x0, y0, x1, y1, ...]) in radar units."""
+        coords = self.coords
+        starts = self.starts
+        scale = 1 / QUANTUM
+        for k, style_id in enumerate(self.style_ids):
+            yield self.styles[style_id], [value * scale for value in coords[2 * starts[k]:2 * starts[k + 1]]]
+
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in (self.coords, self.starts, self.style_ids))
+
+
+def compile_lines(lines, styles, projection, source_bytes=0):
+    """Clean, dedupe, stitch and quantise a loader's lines, projected with projection.
+
+    lines is the loader's GeometryArrays of lines and styles its style table;
+    style ids are kept, so compiled.styles is styles.
+    """
+    segments = {}  # (style id, low end, high end) -> (start, end), so each edge is kept once
+    vertices_in = segments_in = unplaced = degenerate = duplicates = 0
+    forward = projection.forward
+
+    for style_id, coords in lines.parts():
+        points = []
+        for i in range(0, len(coords), 2):
+            lon, lat = coords[i], coords[i + 1]
+            point = None
+            if lon or lat:  # (0, 0) is a placeholder, never a real fix
+                projected = forward(lat, lon)
+                if projected is not None:
+                    point = (round(projected[0] * QUANTUM), round(projected[1] * QUANTUM))
+            points.append(point)
+        vertices_in += len(points)
+        segments_in += max(len(points) - 1, 0)
+
+        for start, end in zip(points, points[1:]):
+            if start is None or end is None:
+                unplaced += 1  # An end is a placeholder or out of range
+                continue
+            if start == end:
+                degenerate += 1
+                continue
+            key = (style_id,) + ((start, end) if start < end else (end, start))
+            if key in segments:
+                duplicates += 1
+            else:
+                segments[key] = (start, end)
+
+    compiled = CompiledLines()
+    compiled.styles = styles
+
+    by_style = {}
+    for (style_id, _, _), segment in segments.items():
+        by_style.setdefault(style_id, []).append(segment)
+    for style_id, style_segments in sorted(by_style.items()):
+        for polyline in _stitch(style_segments):
+            for x, y in polyline:
+                compiled.coords.append(x)
+                compiled.coords.append(y)
+            compiled.starts.append(len(compiled.coords) // 2)
+            compiled.style_ids.append(style_id)
+
+    compiled.stats = {
+        "features_in": len(lines),
+        "vertices_in": vertices_in,
+        "segments_in": segments_in,
+        "bytes_in": source_bytes,
+        "unplaced_dropped": unplaced,
+        "degenerate_dropped": degenerate,
+        "duplicates_dropped": duplicates,
+        "polylines_out": len(compiled),
+        "vertices_out": len(compiled.coords) // 2,
+        "segments_out": len(segments),
+        "bytes_out": compiled.nbytes(),
+    }
+    return compiled
+
+
+def _stitch(segments):
+    """Join segments sharing end points into as few polylines as a greedy walk finds."""
+    at = {}  # end point -> indices of unused segments touching it
+    for i, (start, end) in enumerate(segments):
+        at.setdefault(start, []).append(i)
+        at.setdefault(end, []).append(i)
+    used = bytearray(len(segments))
+
+    def take(point):
+        """Mark and return the far end of an unused segment at point, or None."""
+        candidates = at.get(point)
+        while candidates:
+            i = candidates.pop()
+            if not used[i]:
+                used[i] = 1
+                start, end = segments[i]
+                return end if start == point else start
+        return None
+
+    for i, (start, end) in enumerate(segments):
+        if used[i]:
+            continue
+        used[i] = 1
+        forward = [start, end]
+        point = take(end)
+        while point is not None:
+            forward.append(point)
+            point = take(point)
+        backward = []
+        point = take(start)
+        while point is not None:
+            backward.append(point)
+            point = take(point)
+        backward.reverse()
+        yield backward + forward
+
+
+def format_stats(stats):
+    return (
+        f"{stats['features_in']} features / {stats['segments_in']} segments / {stats['vertices_in']} vertices / "
+        f"{stats['bytes_in']} bytes -> {stats['polylines_out']} polylines / {stats['segments_out']} segments / "
+        f"{stats['vertices_out']} vertices / {stats['bytes_out']} bytes "
+        f"({stats['unplaced_dropped']} placeholder or out-of-range, {stats['degenerate_dropped']} degenerate and "
+        f"{stats['duplicates_dropped']} duplicate segments dropped)"
+    )
+
+
+if __name__ == "__main__":
+    import json
+    import os
+    from .geojsonLoader import GeoJsonLoader
+    from .projection import AzimuthalEquidistant
+
+    # python -m radarcore.mapCompiler Resources/tracons/C90.geojson [...]: report what compiling each map saves
+    configs = json.load(open(os.path.join("Resources", ".TraconConfig")))
+    for path in sys.argv[1:]:
+        facility_id = os.path.splitext(os.path.basename(path))[0]
+        if facility_id in configs:
+            center = configs[facility_id]["radar_settings"]["lat_lon"]
+        else:
+            from .facilityCatalog import describe_map
+            center = describe_map(path)["center"]
+            if center is None:
+                print(f"{facility_id}: no geometry to centre on")
+                continue
+        loader = GeoJsonLoader()
+        loader.load_file(path)
+        compiled = compile_lines(loader.lines, loader.styles, AzimuthalEquidistant(*center), os.path.getsize(path))
+        print(f"{facility_id}: {format_stats(compiled.stats)}")
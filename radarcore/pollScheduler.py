@@ -0,0 +1,50 @@
+import math
+import random
+
+REFERENCE_RANGE_NM = 60  # Visible range at which polling runs at the base interval
+QUERY_MARGIN_NM = 10  # Fetch a little beyond the screen edge so targets don't pop in
+
+
+class PollScheduler:
+    """Adapts the poll interval to server latency, errors and how far the user is zoomed in."""
+
+    def __init__(self, base_interval=2.0, min_interval=1.0, max_interval=60.0, jitter=0.1):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.interval = base_interval
+        self.failures = 0
+        self.zoom_speedup = 1.0
+
+    def record(self, status, latency, retry_after=None):
+        """Feed back the outcome of a poll. status 0 means no response (timeout or network error)."""
+        if status == 0 or status == 429 or status >= 500:
+            # Exponential backoff, honouring Retry-After when the server sends one
+            self.failures += 1
+            backoff = self.base_interval * (2 ** self.failures)
+            if retry_after:
+                backoff = max(backoff, retry_after)
+            self.interval = min(backoff, self.max_interval)
+        else:
+            self.failures = 0
+            # Never poll faster than a few round trips so a slow server isn't hammered
+            target = max(self.base_interval * self.zoom_speedup, latency * 4)
+            self.interval = min(max(target, self.min_interval), self.max_interval)
+
+    def set_view_range(self, visible_nm):
+        """Poll faster when zoomed in tight, down to half the base interval."""
+        self.zoom_speedup = min(max(visible_nm / REFERENCE_RANGE_NM, 0.5), 1.0)
+
+    def next_delay(self):
+        """Seconds until the next poll, with random jitter so clients don't synchronise."""
+        spread = self.interval * self.jitter
+        return max(self.interval + random.uniform(-spread, spread), self.min_interval)
+
+    def next_delay_ms(self):
+        return int(self.next_delay() * 1000)
+
+
+def query_radius(visible_nm, max_radius):
+    """Query dist (nm) matching the visible range, capped at max_radius."""
+    return max(1, min(math.ceil(visible_nm + QUERY_MARGIN_NM), max_radius))
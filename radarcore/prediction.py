@@ -0,0 +1,144 @@
+import math
+from array import array
+
+HORIZONS_MIN = (0.5, 1, 2, 4, 8)  # STARS vector lengths
+MAX_TURN_RATE = 3.0  # deg/s, standard rate; anything faster is treated as noise
+MAX_TURN = 180.0  # deg; beyond this a turn is extrapolated as straight
+TURN_SMOOTHING = 0.5  # Weight of the newest turn rate sample
+TURN_STEPS = 8  # Points per curved vector
+
+
+class PredictionCache:
+    """Prediction vectors for every visible aircraft, worked out once per data update.
+
+    update() walks the table's columns in one pass and stores each row's vector
+    as TURN_STEPS points (or just the end point when turns are ignored) in
+    flat arrays indexed by row, so paint only reads them. Given a projection the
+    points are also projected, into x and y, NaN past its range. The turn rate
+    of each aircraft is estimated from its track in successive updates.
+    """
+
+    def __init__(self, minutes=1, turn_aware=False, projection=None):
+        self.minutes = minutes
+        self.turn_aware = turn_aware
+        self.projection = projection
+        self.steps = 1
+        self.lat = array("d")
+        self.lon = array("d")
+        self.x = array("d")
+        self.y = array("d")
+        self._turns = {}  # hex -> (report time, track, smoothed turn rate)
+        self._table = None
+        self._rows = ()
+
+    def set_horizon(self, minutes):
+        self.minutes = minutes
+        self._recompute()
+
+    def set_turn_aware(self, turn_aware):
+        self.turn_aware = turn_aware
+        self._recompute()
+
+    def set_projection(self, projection):
+        self.projection = projection
+        self._recompute()
+
+    def points(self, i):
+        """The (lat, lon) points of row i's vector, ending at the predicted position."""
+        steps = self.steps
+        start = i * steps
+        return zip(self.lat[start:start + steps], self.lon[start:start + steps])
+
+    def points_xy(self, i):
+        """The projected (x, y) points of row i's vector; needs a projection."""
+        steps = self.steps
+        start = i * steps
+        return zip(self.x[start:start + steps], self.y[start:start + steps])
+
+    def update(self, table, rows=None):
+        """Estimate turn rates from a newly published table and rebuild the vectors of rows.
+
+        rows defaults to table.visible.
+        """
+        self._table = table
+        self._rows = table.visible if rows is None else rows
+        turns = self._turns
+        now = table.timestamp
+        seen = {}
+        hex_ids, track, seen_pos = table.hex, table.track, table.seen_pos
+        for i in self._rows:
+            hex_id = hex_ids[i]
+            heading = track[i]
+            if hex_id is None or heading != heading:
+                continue
+            report_time = now - seen_pos[i] if seen_pos[i] == seen_pos[i] else now
+            rate = 0.0
+            previous = turns.get(hex_id)
+            if previous is not None:
+                last_time, last_heading, last_rate = previous
+                dt = report_time - last_time
+                if dt <= 0:
+                    seen[hex_id] = previous  # Same report as last time
+                    continue
+                if dt < 30:
+                    sample = ((heading - last_heading + 180) % 360 - 180) / dt
+                    if abs(sample) > MAX_TURN_RATE:
+                        sample = 0.0
+                    rate = TURN_SMOOTHING * sample + (1 - TURN_SMOOTHING) * last_rate
+            seen[hex_id] = (report_time, heading, rate)
+        self._turns = seen  # Drops aircraft that are gone
+        self._recompute()
+
+    def _recompute(self):
+        table = self._table
+        if table is None:
+            return
+        steps = TURN_STEPS if self.turn_aware else 1
+        size = table.size * steps
+        if len(self.lat) < size:
+            self.lat = array("d", [math.nan]) * size
+            self.lon = array("d", [math.nan]) * size
+            self.x = array("d", [math.nan]) * size
+            self.y = array("d", [math.nan]) * size
+        self.steps = steps
+        out_lat, out_lon = self.lat, self.lon
+        seconds = self.minutes * 60
+        turns = self._turns
+        lat_col, lon_col, gs_col, track_col, hex_ids = table.lat, table.lon, table.gs, table.track, table.hex
+        forward = self.projection.forward if self.projection is not None else None
+        out_x, out_y = self.x, self.y
+
+        for i in self._rows:
+            lat = lat_col[i]
+            lon = lon_col[i]
+            speed = gs_col[i] / 3600 if gs_col[i] == gs_col[i] else 0.0  # nm/s
+            heading = track_col[i] if track_col[i] == track_col[i] else 0.0
+            rate = turns[hex_ids[i]][2] if steps > 1 and hex_ids[i] in turns else 0.0
+            lon_scale = 1 / (60 * math.cos(math.radians(lat)))
+            base = i * steps
+            for k in range(1, steps + 1):
+                north, east = _displacement(speed, heading, rate, seconds * k / steps)
+                j = base + k - 1
+                out_lat[j] = lat + north / 60
+                out_lon[j] = lon + east * lon_scale
+                if forward is not None:
+                    point = forward(out_lat[j], out_lon[j])
+                    out_x[j], out_y[j] = point if point is not None else (math.nan, math.nan)
+
+
+def _displacement(speed, heading, rate, t):
+    """North and east nm covered in t seconds at speed nm/s from heading, turning at rate deg/s."""
+    h0 = math.radians(heading)
+    if abs(rate) < 0.05:
+        distance = speed * t
+        return distance * math.cos(h0), distance * math.sin(h0)
+
+    turn_time = min(t, MAX_TURN / abs(rate))
+    omega = math.radians(rate)
+    h1 = h0 + omega * turn_time
+    radius = speed / omega
+    north = radius * (math.sin(h1) - math.sin(h0))
+    east = radius * (math.cos(h0) - math.cos(h1))
+    # Straight on along the rolled-out heading for whatever time is left
+    remaining = speed * (t - turn_time)
+    return north + remaining * math.cos(h1), east + remaining * math.sin(h1)
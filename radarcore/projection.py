@@ -0,0 +1,71 @@
+import math
+from array import array
+
+EARTH_RADIUS_NM = 3440.065
+UNITS_PER_NM = 800 / 60  # Radar units per nm, the 800 per degree of latitude the display has always used
+MAX_RANGE_NM = 200 * 1609.34 / 1852  # Nothing is drawn past 200 statute miles from the radar
+
+
+class AzimuthalEquidistant:
+    """Azimuthal-equidistant projection about the radar, built once per centre.
+
+    Distances and bearings from the radar are true at every range, so the
+    range cut-off is a squared-distance test on the projected point. x grows
+    east and y north, in UNITS_PER_NM radar units at scale 1.
+    """
+
+    def __init__(self, center_lat, center_lon, max_range_nm=MAX_RANGE_NM, units_per_nm=UNITS_PER_NM):
+        self.center_lat = center_lat
+        self.center_lon = center_lon
+        self.units_per_nm = units_per_nm
+        self._lat0 = math.radians(center_lat)
+        self._lon0 = math.radians(center_lon)
+        self._sin_lat0 = math.sin(self._lat0)
+        self._cos_lat0 = math.cos(self._lat0)
+        self._radius = EARTH_RADIUS_NM * units_per_nm  # Radar units per radian of arc
+        self.max_range_sq = math.inf
+        if max_range_nm is not None:
+            limit = max_range_nm * units_per_nm
+            self.max_range_sq = limit * limit
+
+    def forward(self, lat, lon):
+        """(x, y) of a point, or None beyond the maximum range."""
+        phi = math.radians(lat)
+        dlon = math.radians(lon) - self._lon0
+        sin_phi = math.sin(phi)
+        cos_phi = math.cos(phi)
+        cos_dlon = math.cos(dlon)
+        cos_c = self._sin_lat0 * sin_phi + self._cos_lat0 * cos_phi * cos_dlon
+        c = math.acos(max(-1.0, min(1.0, cos_c)))
+        k = self._radius * (c / math.sin(c) if c > 1e-12 else 1.0)
+        x = k * cos_phi * math.sin(dlon)
+        y = k * (self._cos_lat0 * sin_phi - self._sin_lat0 * cos_phi * cos_dlon)
+        if x * x + y * y > self.max_range_sq:
+            return None
+        return x, y
+
+    def forward_many(self, lats, lons):
+        """Project sequences of latitudes and longitudes; points out of range come back as NaN."""
+        xs = array("d", [math.nan]) * len(lats)
+        ys = array("d", [math.nan]) * len(lats)
+        forward = self.forward
+        for i in range(len(lats)):
+            point = forward(lats[i], lons[i])
+            if point is not None:
+                xs[i], ys[i] = point
+        return xs, ys
+
+    def inverse(self, x, y):
+        """(lat, lon) of a projected point."""
+        rho = math.hypot(x, y)
+        if rho < 1e-12:
+            return self.center_lat, self.center_lon
+        c = rho / self._radius
+        sin_c = math.sin(c)
+        cos_c = math.cos(c)
+        lat = math.asin(cos_c * self._sin_lat0 + y * sin_c * self._cos_lat0 / rho)
+        lon = self._lon0 + math.atan2(x * sin_c, rho * self._cos_lat0 * cos_c - y * self._sin_lat0 * sin_c)
+        return math.degrees(lat), (math.degrees(lon) + 540) % 360 - 180
+
+    def within_range(self, x, y):
+        return x * x + y * y <= self.max_range_sq
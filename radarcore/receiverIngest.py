@@ -0,0 +1,411 @@
+import asyncio
+import math
+import sys
+import threading
+import time
+from .signals import Signal
+
+# Beast frame type byte -> payload length in bytes
+BEAST_PAYLOAD_LENGTHS = {0x31: 2, 0x32: 7, 0x33: 14}
+BEAST_ESCAPE = 0x1A
+CALLSIGN_CHARSET = "#ABCDEFGHIJKLMNOPQRSTUVWXYZ##### ###############0123456789######"
+STALE_AFTER = 60  # Seconds without a message before an aircraft is dropped
+
+
+class SbsDecoder:
+    """Incremental decoder for SBS-1/BaseStation CSV (dump1090 port 30003)."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """Add received bytes and yield (hex, fields) for every complete MSG line."""
+        buf = self.buffer
+        buf += data
+        start = 0
+        while True:
+            end = buf.find(b"\n", start)
+            if end == -1:
+                break
+            if buf.startswith(b"MSG,", start):
+                line_end = end - 1 if buf[end - 1] == 0x0D else end
+                bounds = _field_bounds(buf, start, line_end)
+                if len(bounds) > 22:
+                    try:
+                        decoded = self._decode(buf, bounds)
+                    except ValueError:
+                        decoded = None  # Garbled field: drop the line, not the feed
+                    if decoded is not None:
+                        yield decoded
+            start = end + 1
+        # Compact once per read instead of once per message
+        del buf[:start]
+
+    @staticmethod
+    def _decode(buf, bounds):
+        """(hex, fields) from one line, copying only the fields that are present."""
+        def field(k):
+            return buf[bounds[k]:bounds[k + 1] - 1]
+
+        def present(k):
+            return bounds[k + 1] - 1 > bounds[k]
+
+        update = {}
+        callsign = field(10).strip()
+        if callsign:
+            update["flight"] = callsign.decode("ascii", "replace")
+        if present(11):
+            update["alt"] = int(float(field(11)))
+        if present(12):
+            update["gs"] = float(field(12))
+        if present(13):
+            update["track"] = float(field(13))
+        if present(14) and present(15):
+            update["lat"] = float(field(14))
+            update["lon"] = float(field(15))
+        if present(17):
+            update["squawk"] = field(17).decode("ascii")
+        if field(19) in (b"-1", b"1"):
+            update["emergency"] = "general"
+        if field(21) in (b"-1", b"1"):
+            update["alt"] = "ground"
+        return field(4).decode("ascii").lower(), update
+
+
+def _field_bounds(buf, start, end):
+    """Start offset of every comma-separated field in buf[start:end], then end + 1."""
+    bounds = [start]
+    pos = buf.find(b",", start, end)
+    while pos != -1:
+        bounds.append(pos + 1)
+        pos = buf.find(b",", pos + 1, end)
+    bounds.append(end + 1)
+    return bounds
+
+
+class BeastDecoder:
+    """Incremental decoder for the Beast binary protocol (dump1090 port 30005)."""
+
+    def __init__(self, ref_lat, ref_lon):
+        self.buffer = bytearray()
+        self.ref_lat = ref_lat  # Receiver position, used for local CPR decoding
+        self.ref_lon = ref_lon
+        self.last_positions = {}
+
+    def feed(self, data):
+        """Add received bytes and yield (hex, fields) for every decodable ADS-B message."""
+        for payload in self.frames(data):
+            decoded = self.decode_mode_s(payload)
+            if decoded is not None:
+                yield decoded
+
+    def frames(self, data):
+        """Yield the Mode S payload of every complete frame in the buffer."""
+        buf = self.buffer
+        buf += data
+        view = memoryview(buf)
+        pos = 0
+        try:
+            while True:
+                pos = buf.find(BEAST_ESCAPE, pos)
+                if pos == -1:
+                    pos = len(buf)  # No frame start left, nothing worth keeping
+                    break
+                if pos + 1 >= len(buf):
+                    break
+                length = BEAST_PAYLOAD_LENGTHS.get(buf[pos + 1])
+                if length is None:
+                    # Escaped 0x1a, status frame or garbage: resynchronise on the next escape
+                    pos += 2 if buf[pos + 1] == BEAST_ESCAPE else 1
+                    continue
+
+                # 6 byte timestamp + 1 byte signal level + payload
+                body_length = 7 + length
+                body_start = pos + 2
+                body_end = body_start + body_length
+                if body_end > len(buf):
+                    break
+                if buf.find(BEAST_ESCAPE, body_start, body_end) == -1:
+                    # Common case: nothing escaped, hand out a view without copying
+                    frame = view[body_start + 7:body_end]
+                    pos = body_end
+                    yield frame
+                    frame.release()
+                    continue
+
+                body, next_pos = self._unescape(buf, body_start, body_length)
+                if body is None:
+                    break
+                pos = next_pos
+                yield memoryview(body)[7:]
+        finally:
+            view.release()
+        # Compact once per read instead of once per frame
+        del buf[:pos]
+
+    @staticmethod
+    def _unescape(buf, start, length):
+        """Collect length bytes from start, collapsing doubled 0x1a. Returns (body, next_pos) or (None, _)."""
+        body = bytearray()
+        pos = start
+        while len(body) < length:
+            if pos >= len(buf):
+                return None, pos
+            byte = buf[pos]
+            if byte == BEAST_ESCAPE:
+                if pos + 1 >= len(buf):
+                    return None, pos
+                pos += 1
+            body.append(byte)
+            pos += 1
+        return body, pos
+
+    def decode_mode_s(self, msg):
+        """Decode an ADS-B extended squitter (DF17/18) into (hex, fields), or None."""
+        if len(msg) != 14:
+            return None
+        df = msg[0] >> 3
+        if df not in (17, 18):
+            return None
+        icao = bytes(msg[1:4]).hex()
+        tc = msg[4] >> 3
+
+        if 1 <= tc <= 4:
+            bits = int.from_bytes(msg[5:11], "big")
+            chars = [CALLSIGN_CHARSET[(bits >> shift) & 0x3F] for shift in range(42, -1, -6)]
+            return icao, {"flight": "".join(chars).replace("#", "").strip()}
+
+        if 9 <= tc <= 18:
+            update = {}
+            alt_code = (msg[5] << 4) | (msg[6] >> 4)
+            if alt_code & 0x10:  # Q bit: 25 ft increments
+                n = ((alt_code & 0xFE0) >> 1) | (alt_code & 0x0F)
+                update["alt"] = n * 25 - 1000
+            odd = (msg[6] >> 2) & 1
+            lat_cpr = (((msg[6] & 3) << 15) | (msg[7] << 7) | (msg[8] >> 1)) / 131072
+            lon_cpr = (((msg[8] & 1) << 16) | (msg[9] << 8) | msg[10]) / 131072
+            ref_lat, ref_lon = self.last_positions.get(icao, (self.ref_lat, self.ref_lon))
+            lat, lon = decode_cpr_local(lat_cpr, lon_cpr, odd, ref_lat, ref_lon)
+            self.last_positions[icao] = (lat, lon)
+            update["lat"] = lat
+            update["lon"] = lon
+            return icao, update
+
+        if tc == 19 and (msg[4] & 7) in (1, 2):
+            v_ew = (((msg[5] & 3) << 8) | msg[6]) - 1
+            v_ns = (((msg[7] & 0x7F) << 3) | (msg[8] >> 5)) - 1
+            if v_ew < 0 or v_ns < 0:
+                return icao, {}
+            if (msg[4] & 7) == 2:  # Supersonic encoding
+                v_ew *= 4
+                v_ns *= 4
+            vx = -v_ew if msg[5] & 0x04 else v_ew
+            vy = -v_ns if msg[7] & 0x80 else v_ns
+            return icao, {
+                "gs": math.hypot(vx, vy),
+                "track": math.degrees(math.atan2(vx, vy)) % 360,
+            }
+
+        return None
+
+
+def cpr_nl(lat):
+    """Number of longitude zones at a latitude (ADS-B CPR NL function)."""
+    if lat == 0:
+        return 59
+    if abs(lat) == 87:
+        return 2
+    if abs(lat) > 87:
+        return 1
+    a = 1 - math.cos(math.pi / 30)
+    b = math.cos(math.radians(abs(lat))) ** 2
+    return math.floor(2 * math.pi / math.acos(1 - a / b))
+
+
+def decode_cpr_local(lat_cpr, lon_cpr, odd, ref_lat, ref_lon):
+    """Locally unambiguous CPR decode against a reference within 180 nm."""
+    dlat = 360 / (59 if odd else 60)
+    j = math.floor(ref_lat / dlat) + math.floor(0.5 + (ref_lat % dlat) / dlat - lat_cpr)
+    lat = dlat * (j + lat_cpr)
+    dlon = 360 / max(cpr_nl(lat) - odd, 1)
+    m = math.floor(ref_lon / dlon) + math.floor(0.5 + (ref_lon % dlon) / dlon - lon_cpr)
+    lon = dlon * (m + lon_cpr)
+    return lat, lon
+
+
+class ReceiverSource(threading.Thread):
+    """Streams aircraft from a local dump1090-style receiver over TCP."""
+
+    def __init__(self, snapshots, host, port, protocol="sbs", ref_lat=0.0, ref_lon=0.0, publish_interval=0.5):
+        super().__init__(name="receiver", daemon=True)
+        self.snapshot_ready = Signal()
+        self.snapshots = snapshots
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.ref_lat = ref_lat
+        self.ref_lon = ref_lon
+        self.publish_interval = publish_interval
+        self.aircraft = {}  # hex -> report in the same shape as the HTTP feed
+        self.loop = None
+
+    def run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.loop = loop
+        tasks = [loop.create_task(self._receive()), loop.create_task(self._publish())]
+        try:
+            loop.run_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop = None
+            loop.close()
+
+    def stop(self):
+        """Disconnect and wait for the thread to finish."""
+        loop = self.loop
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        if self.is_alive():
+            self.join()
+
+    async def _receive(self):
+        delay = 1
+        while True:
+            if self.protocol == "beast":
+                decoder = BeastDecoder(self.ref_lat, self.ref_lon)
+            else:
+                decoder = SbsDecoder()
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                print(f"Receiver {self.host}:{self.port} unavailable ({e}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+
+            print(f"Connected to receiver {self.host}:{self.port} ({self.protocol})")
+            delay = 1
+            try:
+                while True:
+                    data = await reader.read(65536)
+                    if not data:
+                        break
+                    now = time.monotonic()
+                    for icao, update in decoder.feed(data):
+                        self._apply(icao, update, now)
+            except OSError as e:
+                print(f"Receiver connection lost: {e}")
+            finally:
+                writer.close()
+
+    def _apply(self, icao, update, now):
+        report = self.aircraft.get(icao)
+        if report is None:
+            report = self.aircraft[icao] = {
+                'hex': icao, 'flight': None, 'lat': None, 'lon': None, 'alt': None,
+                'gs': None, 'track': None, 'mag_heading': None, 'emergency': None,
+                'type': None, 'seen_pos': None, '_seen': now, '_pos_time': None,
+            }
+        report.update(update)
+        report['_seen'] = now
+        if 'lat' in update:
+            report['_pos_time'] = now
+
+    async def _publish(self):
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            now = time.monotonic()
+            with self.snapshots.writing() as table:
+                for icao in list(self.aircraft):
+                    report = self.aircraft[icao]
+                    if now - report['_seen'] > STALE_AFTER:
+                        del self.aircraft[icao]
+                        continue
+                    if report['_pos_time'] is None:
+                        continue
+                    i = table.append(report)
+                    table.seen_pos[i] = now - report['_pos_time']
+            self.snapshot_ready.emit()
+
+
+class ReplayServer:
+    """Local stand-in for a receiver: replays canned SBS or Beast bytes to every client."""
+
+    def __init__(self, messages, host="127.0.0.1", port=0, interval=0.1, loop_forever=True):
+        self.messages = list(messages)  # Each item is sent as one write
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.loop_forever = loop_forever
+        self.loop = None
+        self._server = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start serving on a background thread; returns the bound port."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self.port
+
+    def stop(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._server = self.loop.run_until_complete(
+            asyncio.start_server(self._serve_client, self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self._server.close()
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.close()
+
+    async def _serve_client(self, reader, writer):
+        try:
+            while True:
+                for message in self.messages:
+                    writer.write(message)
+                    await writer.drain()
+                    await asyncio.sleep(self.interval)
+                if not self.loop_forever:
+                    break
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            pass  # Client went away or the server is shutting down
+        finally:
+            writer.close()
+
+
+if __name__ == "__main__":
+    # Replay a capture for offline testing: python -m radarcore.receiverIngest capture.sbs [port]
+    if len(sys.argv) < 2:
+        print("Usage: python -m radarcore.receiverIngest <capture file> [port]")
+        sys.exit(1)
+    with open(sys.argv[1], "rb") as f:
+        capture = f.read()
+    if sys.argv[1].endswith(".sbs"):
+        messages = capture.splitlines(keepends=True)
+    else:
+        messages = [capture[i:i + 4096] for i in range(0, len(capture), 4096)]
+    server = ReplayServer(messages, port=int(sys.argv[2]) if len(sys.argv) > 2 else 30003)
+    print(f"Replaying {sys.argv[1]} on port {server.start()}, Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,28 @@
+import threading
+
+
+class Signal:
+    """Minimal Qt-free stand-in for pyqtSignal: connect, disconnect and emit to plain callables.
+
+    Slots run on the emitting thread. A Qt display that needs them on the GUI
+    thread connects a pyqtSignal's emit, which Qt queues across threads.
+    """
+
+    def __init__(self):
+        self._slots = []
+        self._lock = threading.Lock()
+
+    def connect(self, slot):
+        with self._lock:
+            self._slots = self._slots + [slot]
+
+    def disconnect(self, slot):
+        with self._lock:
+            slots = list(self._slots)
+            slots.remove(slot)  # ValueError if it was never connected, as with Qt's TypeError
+            self._slots = slots
+
+    def emit(self, *args):
+        # The list is replaced, never mutated, so this snapshot is safe without the lock
+        for slot in self._slots:
+            slot(*args)
@@ -0,0 +1,186 @@
+import codecs
+import json
+import re
+
+_SKIP = re.compile(r"[\s,]*")
+_STRUCTURE = re.compile(r'[][{}"]')
+_STRING_STOP = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[\s,\]}]")
+
+
+class JsonArrayStream:
+    """Incrementally yields the elements of one array member of a top-level JSON object.
+
+    Bytes are fed as they arrive and each element is decoded as soon as it is
+    complete, so only the current partial element is ever held in memory.
+    The object's other members are decoded into members as they go past.
+    A value cut off by the end of a chunk has its brackets and strings tracked
+    as the rest arrives and is only decoded again once it has closed, so an
+    element spanning many chunks is scanned once and decoded twice at most.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.done = False
+        self.members = {}
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._text = ""
+        self._pos = 0  # Read offset into _text
+        self._parts = []  # Chunks that arrived while the value at _pos was still open
+        self._open = False  # A value starts at _pos and its end hasn't been decoded yet
+        self._end = None  # Where in _text the open value ends, once that has been seen
+        self._scalar = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._state = "start"
+        self._current_key = None
+
+    def feed(self, data):
+        """Add a chunk of bytes and yield every element completed by it."""
+        return self._scan(self._utf8.decode(data), final=False)
+
+    def close(self):
+        """Signal the end of the body and yield anything left; raises ValueError if truncated."""
+        yield from self._scan(self._utf8.decode(b"", final=True), final=True)
+        if not self.done:
+            raise ValueError("JSON document ended early")
+
+    def _scan(self, chunk, final):
+        if self._open:
+            # Only the new chunk needs scanning; the value is joined up once, when its end turns up
+            end = self._find_end(chunk, 0, final)
+            if end is None and not final:
+                self._parts.append(chunk)
+                return
+            head = self._text[self._pos:] + "".join(self._parts)
+            self._parts = []
+            self._text = head + chunk
+            self._end = len(self._text) if end is None else len(head) + end
+        else:
+            self._text = self._text[self._pos:] + chunk
+        self._pos = 0
+        text = self._text
+        while not self.done:
+            pos = _SKIP.match(text, self._pos).end()
+            if pos >= len(text):
+                self._pos = pos
+                return
+            char = text[pos]
+            state = self._state
+
+            if state == "start":
+                if char != "{":
+                    raise ValueError(f"Expected an object, found {char!r}")
+                self._pos = pos + 1
+                self._state = "key"
+
+            elif state == "key":
+                if char == "}":
+                    self._pos = pos + 1
+                    self.done = True
+                    return
+                value = self._decode(text, pos, final)
+                if value is None:
+                    return
+                self._current_key = value[0]
+                self._state = "colon"
+
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError(f"Expected ':', found {char!r}")
+                self._pos = pos + 1
+                self._state = "array" if self._current_key == self.key else "value"
+
+            elif state == "value":
+                # Some other member: decode and keep it aside
+                value = self._decode(text, pos, final)
+                if value is None:
+                    return
+                self.members[self._current_key] = value[0]
+                self._state = "key"
+
+            elif state == "array":
+                if char != "[":
+                    # The key is there but not an array (e.g. null): nothing to yield
+                    self._state = "value"
+                    continue
+                self._pos = pos + 1
+                self._state = "element"
+
+            elif state == "element":
+                if char == "]":
+                    self._pos = pos + 1
+                    self._state = "key"
+                    continue
+                value = self._decode(text, pos, final)
+                if value is None:
+                    return
+                yield value[0]
+
+    def _decode(self, text, pos, final):
+        """Decode one value at pos; returns a 1-tuple, or None when more data is needed."""
+        if not self._open:
+            try:
+                value, end = self._decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                end = None
+            # A number or literal is only complete once a delimiter follows it,
+            # otherwise "3." of "3.5" would decode as 3
+            if end is not None and (final or text[end - 1] in '"}]' or end < len(text) and text[end] in " \t\r\n,]}"):
+                self._pos = end
+                return (value,)
+            # Cut off: follow it through the coming chunks instead of re-decoding it with each one
+            self._open = True
+            self._scalar = text[pos] not in '{["'
+            self._depth = 0
+            self._in_string = self._escaped = False
+            self._end = self._find_end(text, pos, final)
+            if self._end is None:
+                if not final:
+                    return None
+                self._end = len(text)
+        self._open = False
+        # The value has closed, so a decode error now is malformed JSON, not a short read
+        value, end = self._decoder.raw_decode(text, pos)
+        self._pos = end
+        return (value,)
+
+    def _find_end(self, text, i, final):
+        """Continue scanning the open value through text from i; returns the index just past it, or None."""
+        if self._scalar:
+            match = _SCALAR_END.search(text, i)
+            if match is not None:
+                return match.start()
+            return len(text) if final else None
+        while True:
+            if self._escaped:
+                # The backslash ended the previous chunk
+                if i >= len(text):
+                    return None
+                self._escaped = False
+                i += 1
+            if self._in_string:
+                match = _STRING_STOP.search(text, i)
+                if match is None:
+                    return None
+                i = match.end()
+                if match.group() == "\\":
+                    self._escaped = True
+                    continue
+                self._in_string = False
+            else:
+                match = _STRUCTURE.search(text, i)
+                if match is None:
+                    return None
+                i = match.end()
+                char = match.group()
+                if char == '"':
+                    self._in_string = True
+                    continue
+                self._depth += 1 if char in "[{" else -1
+            if self._depth == 0:
+                return i
@@ -0,0 +1,224 @@
+import csv
+import gzip
+import os
+import queue
+import threading
+import time
+from array import array
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+DEFAULT_EXPORT_DIR = os.path.join(os.path.expanduser("~"), ".radarview", "export")
+
+# Column order of every exported file. "published" is when the snapshot went
+# live; the report itself is published - seen_pos seconds old.
+FLOAT_COLUMNS = ("published", "lat", "lon", "alt", "gs", "track", "mag_heading", "seen_pos")
+TEXT_COLUMNS = ("hex", "flight", "squawk", "type", "emergency")
+EXPORT_COLUMNS = ("published", "hex", "flight", "lat", "lon", "alt", "ground", "gs", "track", "mag_heading",
+                  "squawk", "type", "emergency", "seen_pos")
+
+
+def best_format():
+    """Parquet when pyarrow has it, Arrow IPC with bare pyarrow, otherwise gzipped CSV."""
+    if pq is not None:
+        return "parquet"
+    if pa is not None:
+        return "arrow"
+    return "csv.gz"
+
+
+class TrackExporter(threading.Thread):
+    """Streams published aircraft tables to columnar files partitioned by TRACON and hour.
+
+    submit() runs on the ingest thread and only slices the table's columns,
+    which copies the arrays without creating an object per row. This thread
+    concatenates the slices into batches of at most batch_rows and appends them
+    to tracon=<id>/hour=<UTC hour>/part-<start>.<format> under root; a file is
+    closed as soon as its hour is over, even if no snapshot arrives after it.
+    """
+
+    def __init__(self, root=DEFAULT_EXPORT_DIR, tracon="", file_format=None, batch_rows=50000,
+                 flush_seconds=60):
+        super().__init__(daemon=True)
+        self.root = root
+        self.tracon = tracon  # Read at submit time so switching TRACON starts a new partition
+        self.file_format = file_format or best_format()
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        self.queue = queue.Queue(maxsize=256)
+        self._part = None  # The open file of the current partition
+        self._part_end = None  # Unix time its hour is over
+        self._batch = None
+
+    def submit(self, table):
+        """Queue a copy of the table's columns as it is about to be published."""
+        n = table.size
+        if not n:
+            return
+        chunk = {name: getattr(table, name)[:n] for name in FLOAT_COLUMNS if name != "published"}
+        for name in TEXT_COLUMNS:
+            chunk[name] = getattr(table, name)[:n]
+        chunk["ground"] = table.ground[:n]
+        chunk["published"] = array("d", [table.timestamp]) * n
+        try:
+            self.queue.put_nowait((self.tracon, table.timestamp, n, chunk))
+        except queue.Full:
+            print("Track exporter is falling behind, dropping a snapshot")
+
+    def stop(self):
+        self.queue.put(None)
+        self.join()
+
+    def run(self):
+        deadline = None
+        try:
+            while True:
+                waits = []
+                if deadline is not None:
+                    waits.append(deadline - time.monotonic())
+                if self._part is not None:
+                    waits.append(self._part_end - time.time())
+                timeout = max(min(waits), 0) if waits else None
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    break
+                if item:
+                    tracon, published, n, chunk = item
+                    partition = (tracon, time.strftime("%Y-%m-%dT%H", time.gmtime(published)))
+                    if self._part is not None and self._part.partition != partition:
+                        self._flush()
+                        self._part.close()
+                        self._part = None
+                    if self._part is None:
+                        self._part = self._open(partition)
+                        self._part_end = published - published % 3600 + 3600
+                    self._add(chunk, n)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_seconds
+                if self._batch is not None and (self._batch.rows >= self.batch_rows or time.monotonic() >= deadline):
+                    self._flush()
+                    deadline = None
+                if self._part is not None and time.time() >= self._part_end:
+                    # The hour is over: close now so the file is readable while the feed is quiet
+                    self._flush()
+                    self._part.close()
+                    self._part = None
+                    deadline = None
+        finally:
+            self._flush()
+            if self._part is not None:
+                self._part.close()
+
+    def _open(self, partition):
+        tracon, hour = partition
+        directory = os.path.join(self.root, f"tracon={tracon or 'unknown'}", f"hour={hour}")
+        os.makedirs(directory, exist_ok=True)
+        # Parquet and Arrow files can't be appended to once closed, so every run starts its own part
+        path = os.path.join(directory, f"part-{int(time.time() * 1000)}.{self.file_format}")
+        if self.file_format == "parquet":
+            return _ParquetPart(partition, path)
+        if self.file_format == "arrow":
+            return _ArrowPart(partition, path)
+        return _CsvPart(partition, path)
+
+    def _add(self, chunk, n):
+        if self._batch is None:
+            self._batch = _Batch()
+        self._batch.extend(chunk, n)
+
+    def _flush(self):
+        if self._batch is None:
+            return
+        self._part.write(self._batch)
+        self._batch = None
+
+
+class _Batch:
+    """Columns of several snapshots concatenated in place."""
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = {name: array("d") for name in FLOAT_COLUMNS}
+        self.columns.update({name: [] for name in TEXT_COLUMNS})
+        self.columns["ground"] = bytearray()
+
+    def extend(self, chunk, n):
+        for name, column in self.columns.items():
+            column.extend(chunk[name])
+        self.rows += n
+
+
+def _arrow_table(batch):
+    """Wrap the batch's buffers as Arrow columns; the numeric ones aren't copied."""
+    n = batch.rows
+    arrays = []
+    for name in EXPORT_COLUMNS:
+        column = batch.columns[name]
+        if name == "ground":
+            arrays.append(pa.Array.from_buffers(pa.uint8(), n, [None, pa.py_buffer(column)]))
+        elif name in TEXT_COLUMNS:
+            arrays.append(pa.array(column, pa.string()))
+        else:
+            arrays.append(pa.Array.from_buffers(pa.float64(), n, [None, pa.py_buffer(column)]))
+    return pa.Table.from_arrays(arrays, names=list(EXPORT_COLUMNS))
+
+
+def _arrow_schema():
+    return pa.schema([
+        (name, pa.uint8() if name == "ground" else pa.string() if name in TEXT_COLUMNS else pa.float64())
+        for name in EXPORT_COLUMNS
+    ])
+
+
+class _ParquetPart:
+    def __init__(self, partition, path):
+        self.partition = partition
+        self.writer = pq.ParquetWriter(path, _arrow_schema(), compression="zstd")
+
+    def write(self, batch):
+        self.writer.write_table(_arrow_table(batch))  # One row group per batch
+
+    def close(self):
+        self.writer.close()
+
+
+class _ArrowPart:
+    def __init__(self, partition, path):
+        self.partition = partition
+        self.sink = pa.OSFile(path, "wb")
+        self.writer = pa.ipc.new_file(self.sink, _arrow_schema())
+
+    def write(self, batch):
+        self.writer.write_table(_arrow_table(batch))
+
+    def close(self):
+        self.writer.close()
+        self.sink.close()
+
+
+class _CsvPart:
+    """Fallback without pyarrow: one gzip member per batch, readable as a single CSV."""
+
+    def __init__(self, partition, path):
+        self.partition = partition
+        self.path = path
+        with gzip.open(path, "wt", newline="") as f:
+            csv.writer(f).writerow(EXPORT_COLUMNS)
+
+    def write(self, batch):
+        columns = batch.columns
+        with gzip.open(self.path, "at", newline="") as f:
+            csv.writer(f).writerows(zip(*(columns[name] for name in EXPORT_COLUMNS)))
+
+    def close(self):
+        pass
@@ -0,0 +1,265 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".radarview", "history.sqlite")
+STALE_AFTER = 60  # Seconds without a report before an aircraft drops out of a keyframe or playback
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    hex TEXT,
+    flight TEXT,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    alt REAL,
+    gs REAL,
+    track REAL,
+    ground INTEGER NOT NULL DEFAULT 0,
+    squawk TEXT,
+    type TEXT
+);
+CREATE INDEX IF NOT EXISTS reports_ts ON reports(ts);
+CREATE INDEX IF NOT EXISTS reports_hex_ts ON reports(hex, ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS reports_rtree USING rtree(
+    id, min_lat, max_lat, min_lon, max_lon, min_ts, max_ts
+);
+CREATE TABLE IF NOT EXISTS keyframes (
+    ts REAL PRIMARY KEY,
+    state BLOB NOT NULL
+);
+"""
+
+REPORT_COLUMNS = "ts, hex, flight, lat, lon, alt, gs, track, ground, squawk, type"
+
+
+class TrackHistoryStore:
+    """SQLite track history with a time index and a (lat, lon, time) R-tree.
+
+    One instance per thread: the writer thread owns one, readers open their own.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.db_path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA auto_vacuum = INCREMENTAL")  # Only takes effect on a new file
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode = WAL")  # Readers don't block the writer
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def write_batch(self, rows):
+        """Insert rows of (ts, hex, flight, lat, lon, alt, gs, track, ground, squawk, type) in one transaction."""
+        if not rows:
+            return
+        with self.connection:
+            last_id = self.connection.execute("SELECT IFNULL(MAX(id), 0) FROM reports").fetchone()[0]
+            self.connection.executemany(
+                f"INSERT INTO reports ({REPORT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.connection.execute(
+                "INSERT INTO reports_rtree SELECT id, lat, lat, lon, lon, ts, ts FROM reports WHERE id > ?",
+                (last_id,),
+            )
+
+    def tracks_in_box(self, min_lat, min_lon, max_lat, max_lon, start, end):
+        """All reports inside a lat/lon box between two unix times, ordered by hex then time."""
+        # The R-tree stores 32-bit floats rounded outwards, so it narrows the
+        # search and the exact bounds are re-checked on the reports themselves
+        return self.connection.execute(
+            f"""
+            SELECT {REPORT_COLUMNS} FROM reports_rtree AS box
+            JOIN reports AS r ON r.id = box.id
+            WHERE box.min_lat >= ? AND box.max_lat <= ?
+              AND box.min_lon >= ? AND box.max_lon <= ?
+              AND box.max_ts >= ? AND box.min_ts <= ?
+              AND r.lat BETWEEN ? AND ? AND r.lon BETWEEN ? AND ?
+              AND r.ts BETWEEN ? AND ?
+            ORDER BY r.hex, r.ts
+            """,
+            (
+                min_lat - 1e-4, max_lat + 1e-4, min_lon - 1e-4, max_lon + 1e-4, start - 300, end + 300,
+                min_lat, max_lat, min_lon, max_lon, start, end,
+            ),
+        ).fetchall()
+
+    def path(self, hex_id, start=None, end=None):
+        """Full path of one aircraft, by default since local midnight today."""
+        if start is None:
+            start = time.mktime(time.localtime()[:3] + (0, 0, 0, 0, 0, -1))
+        if end is None:
+            end = time.time()
+        return self.connection.execute(
+            f"SELECT {REPORT_COLUMNS} FROM reports WHERE hex = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+            (hex_id, start, end),
+        ).fetchall()
+
+    def write_keyframe(self, ts, rows):
+        """Store the full traffic picture at ts so playback can seek without replaying from the start."""
+        state = zlib.compress(json.dumps(rows, separators=(",", ":")).encode("utf-8"))
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO keyframes (ts, state) VALUES (?, ?)", (ts, state))
+
+    def keyframe_before(self, ts):
+        """The latest keyframe at or before ts as (keyframe_ts, rows), or (None, [])."""
+        found = self.connection.execute(
+            "SELECT ts, state FROM keyframes WHERE ts <= ? ORDER BY ts DESC LIMIT 1", (ts,)
+        ).fetchone()
+        if found is None:
+            return None, []
+        return found[0], [tuple(row) for row in json.loads(zlib.decompress(found[1]))]
+
+    def latest_between(self, start, end):
+        """The newest report per identified aircraft with start < ts <= end."""
+        # SQLite returns the bare columns from the row holding MAX(ts)
+        return self.connection.execute(
+            """
+            SELECT MAX(ts), hex, flight, lat, lon, alt, gs, track, ground, squawk, type
+            FROM reports WHERE ts > ? AND ts <= ? AND hex IS NOT NULL GROUP BY hex
+            """,
+            (start, end),
+        ).fetchall()
+
+    def time_range(self):
+        """(first, last) report times, or (None, None) when empty."""
+        # Separately, each is a single seek on the ts index; together they scan it
+        first = self.connection.execute("SELECT MIN(ts) FROM reports").fetchone()[0]
+        last = self.connection.execute("SELECT MAX(ts) FROM reports").fetchone()[0]
+        return first, last
+
+    def prune(self, older_than):
+        """Delete every report before a unix time; returns how many were removed."""
+        with self.connection:
+            self.connection.execute("DELETE FROM keyframes WHERE ts < ?", (older_than,))
+            self.connection.execute(
+                "DELETE FROM reports_rtree WHERE id IN (SELECT id FROM reports WHERE ts < ?)", (older_than,)
+            )
+            return self.connection.execute("DELETE FROM reports WHERE ts < ?", (older_than,)).rowcount
+
+    def compact(self):
+        """Return free pages left by pruning to the filesystem."""
+        # executescript steps the pragma to completion; execute() would free a single page
+        self.connection.executescript("PRAGMA incremental_vacuum;")
+        if self.db_path != ":memory:":
+            self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+class HistoryWriter(threading.Thread):
+    """Records published aircraft tables to the history store in batched transactions.
+
+    submit() is called on the ingest thread and only copies the rows it needs;
+    all database work happens on this thread.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH, retention_hours=24, batch_seconds=1.0,
+                 prune_interval=600, keyframe_interval=30):
+        super().__init__(daemon=True)
+        self.db_path = path
+        self.retention = retention_hours * 3600
+        self.batch_seconds = batch_seconds
+        self.prune_interval = prune_interval
+        self.keyframe_interval = keyframe_interval
+        self.queue = queue.Queue(maxsize=256)
+        self._last_written = {}  # hex -> ((lat, lon, alt), ts) so unchanged reports aren't stored again
+        self._latest = {}  # hex -> (last seen, latest row), the picture a keyframe captures
+
+    def submit(self, table):
+        """Queue every positioned row of a table about to be published."""
+        now = table.timestamp
+        rows = []
+        lat, lon = table.lat, table.lon
+        for i in range(table.size):
+            if lat[i] != lat[i] or lon[i] != lon[i]:
+                continue
+            seen = table.seen_pos[i]
+            rows.append((
+                now - seen if seen == seen else now, table.hex[i], table.flight[i], lat[i], lon[i],
+                _nullable(table.alt[i]), _nullable(table.gs[i]), _nullable(table.track[i]),
+                table.ground[i], table.squawk[i], table.type[i],
+            ))
+        try:
+            self.queue.put_nowait(rows)
+        except queue.Full:
+            print("History writer is falling behind, dropping a snapshot")
+
+    def stop(self):
+        self.queue.put(None)
+        self.join()
+
+    def run(self):
+        store = TrackHistoryStore(self.db_path)
+        next_prune = time.monotonic()
+        next_keyframe = time.monotonic() + self.keyframe_interval
+        pending = []
+        deadline = None
+        running = True
+        try:
+            while running:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    rows = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    rows = []
+                if rows is None:
+                    running = False
+                else:
+                    pending.extend(self._changed(rows))
+                    if pending and deadline is None:
+                        deadline = time.monotonic() + self.batch_seconds
+
+                if pending and (not running or time.monotonic() >= deadline):
+                    store.write_batch(pending)
+                    pending = []
+                    deadline = None
+
+                if time.monotonic() >= next_keyframe:
+                    # Written after the flush so the reports leading up to it are already stored
+                    self._write_keyframe(store)
+                    next_keyframe = time.monotonic() + self.keyframe_interval
+
+                if time.monotonic() >= next_prune:
+                    removed = store.prune(time.time() - self.retention)
+                    if removed:
+                        store.compact()
+                        print(f"Pruned {removed} history reports older than {self.retention // 3600}h")
+                    next_prune = time.monotonic() + self.prune_interval
+        finally:
+            store.close()
+
+    def _changed(self, rows):
+        last_written = self._last_written
+        latest = self._latest
+        for row in rows:
+            key = row[1]
+            if key is not None:
+                latest[key] = (row[0], row)
+                state = (row[3], row[4], row[5])
+                written = last_written.get(key)
+                # An unchanged report is still stored every STALE_AFTER / 2, or playback
+                # would drop a parked or hovering target between keyframes
+                if written is not None and written[0] == state and row[0] - written[1] < STALE_AFTER / 2:
+                    continue
+                last_written[key] = (state, row[0])
+            yield row
+
+    def _write_keyframe(self, store):
+        now = time.time()
+        for key in [key for key, (seen, _) in self._latest.items() if seen < now - STALE_AFTER]:
+            del self._latest[key]
+            self._last_written.pop(key, None)
+        store.write_keyframe(now, [row for _, row in self._latest.values()])
+
+
+def _nullable(value):
+    """NaN columns are stored as NULL."""
+    return None if value != value else value
@@ -0,0 +1,447 @@
+"""Headless track server: one ingest pipeline fanned out to any number of scopes.
+
+The server runs a TrafficCore of its own and streams every published table to
+subscribed clients over TCP as compact binary deltas, so a room full of scopes
+polls adsb.lol once and parses and tracks once. Run it from the repository root:
+
+    python -m radarcore.trackServer --tracon C90 --host 0.0.0.0
+
+and start each scope with RadarMain.py --server host:port, or give its TRACON
+config a "server": {"host": ..., "port": ...} block.
+"""
+import asyncio
+import json
+import math
+import queue
+import struct
+import sys
+import threading
+
+from .signals import Signal
+
+DEFAULT_PORT = 30200
+NAN = math.nan
+
+# A frame is a header, the upserted records, then the ids of removed aircraft.
+# A keyframe replaces the client's whole state, a delta carries what changed
+KEYFRAME = 1
+DELTA = 2
+FRAME_HEADER = struct.Struct("<IBdII")  # payload length, kind, timestamp, upserts, removals
+MASK = struct.Struct("<H")
+FLOAT = struct.Struct("<f")
+DOUBLE = struct.Struct("<d")
+
+# Record fields in mask bit order. Positions and speeds go as float32, under a
+# metre at any longitude; the position time is absolute so it only changes
+# when a new position comes in, not on every frame like seen_pos would
+FIELDS = ("lat", "lon", "alt", "gs", "track", "mag_heading", "pos_time",
+          "ground", "flight", "emergency", "type", "squawk")
+ALL_FIELDS = MASK.pack((1 << len(FIELDS)) - 1)
+EMPTY_RECORD = (NAN, NAN, NAN, NAN, NAN, NAN, NAN, 0, None, None, None, None)
+
+
+def _text(value):
+    """Length-prefixed UTF-8, 255 for None."""
+    if value is None:
+        return b"\xff"
+    data = value.encode("utf-8")[:254]
+    return bytes((len(data),)) + data
+
+
+def _read_text(buf, pos):
+    length = buf[pos]
+    if length == 255:
+        return None, pos + 1
+    end = pos + 1 + length
+    return bytes(buf[pos + 1:end]).decode("utf-8", "replace"), end
+
+
+def _read_float(buf, pos):
+    return FLOAT.unpack_from(buf, pos)[0], pos + 4
+
+
+def _read_double(buf, pos):
+    return DOUBLE.unpack_from(buf, pos)[0], pos + 8
+
+
+def _read_flag(buf, pos):
+    return buf[pos], pos + 1
+
+
+READERS = (_read_float,) * 6 + (_read_double, _read_flag) + (_read_text,) * 4
+
+
+def encode_row(table, i):
+    """Wire fields of one table row, each already encoded so rows diff by comparing bytes."""
+    seen = table.seen_pos[i]
+    pack = FLOAT.pack
+    return (
+        pack(table.lat[i]), pack(table.lon[i]), pack(table.alt[i]), pack(table.gs[i]),
+        pack(table.track[i]), pack(table.mag_heading[i]),
+        DOUBLE.pack(table.timestamp - seen if seen == seen else NAN),
+        b"\x01" if table.ground[i] else b"\x00",
+        _text(table.flight[i]), _text(table.emergency[i]), _text(table.type[i]), _text(table.squawk[i]),
+    )
+
+
+def encode_frame(kind, timestamp, records, removed):
+    """A frame from encoded upsert records and the ids of removed aircraft."""
+    payload = b"".join(records) + b"".join(_text(key) for key in removed)
+    return FRAME_HEADER.pack(len(payload), kind, timestamp, len(records), len(removed)) + payload
+
+
+def parse_address(text, default_port=DEFAULT_PORT):
+    """Server block {"host", "port"} from "host", "host:port" or ":port"."""
+    host, sep, port = text.rpartition(":")
+    if not sep:
+        return {"host": text, "port": default_port}
+    return {"host": host or "127.0.0.1", "port": int(port)}
+
+
+class TrackServer:
+    """Streams published tables to TrackClients over TCP; add it to a SnapshotBuffer's sinks.
+
+    Rows are encoded once on the ingest thread and diffed on the server's own
+    asyncio thread, and the same delta bytes go to every client, so each extra
+    client costs one socket write per frame. A client that stops reading is
+    skipped once max_buffer bytes are queued for it and sent a keyframe when it
+    has caught up, so it never holds back the others.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, max_buffer=1 << 20):
+        self.host = host
+        self.port = port
+        self.max_buffer = max_buffer
+        self.rows = {}  # hex -> encoded fields as last sent
+        self.timestamp = 0.0
+        self.clients = {}  # writer -> True while it is behind and owed a keyframe
+        self.frames = 0
+        self.bytes_sent = 0
+        self.loop = None
+        self._keyframe = None  # Cached until the next publish, for clients connecting in between
+        self._server = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start serving on a background thread; returns the bound port."""
+        self._thread = threading.Thread(target=self._run, name="track-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self.port
+
+    def stop(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+
+    def submit(self, table):
+        """Encode every row of a table about to be published and queue it for the clients."""
+        loop = self.loop
+        if loop is None:
+            return
+        rows = {}
+        hexes = table.hex
+        for i in range(table.size):
+            if hexes[i] is not None:  # Deltas are keyed by hex, anonymous rows can't be followed
+                rows[hexes[i]] = encode_row(table, i)
+        try:
+            loop.call_soon_threadsafe(self._publish, table.timestamp, rows)
+        except RuntimeError:
+            pass  # Shutting down
+
+    def diff(self, timestamp, rows):
+        """Delta frame from the last state sent to this table's rows, which become the new state."""
+        previous = self.rows
+        records = []
+        for key, fields in rows.items():
+            old = previous.get(key)
+            if old is None:
+                records.append(_text(key) + ALL_FIELDS + b"".join(fields))
+                continue
+            if old == fields:
+                continue
+            mask = 0
+            changed = []
+            for bit, (new, was) in enumerate(zip(fields, old)):
+                if new != was:
+                    mask |= 1 << bit
+                    changed.append(new)
+            records.append(_text(key) + MASK.pack(mask) + b"".join(changed))
+        removed = [key for key in previous if key not in rows]
+        self.rows = rows
+        self.timestamp = timestamp
+        self._keyframe = None
+        return encode_frame(DELTA, timestamp, records, removed)
+
+    def keyframe(self):
+        """Frame carrying the whole current state."""
+        if self._keyframe is None:
+            records = [_text(key) + ALL_FIELDS + b"".join(fields) for key, fields in self.rows.items()]
+            self._keyframe = encode_frame(KEYFRAME, self.timestamp, records, ())
+        return self._keyframe
+
+    def _publish(self, timestamp, rows):
+        frame = self.diff(timestamp, rows)
+        for writer, behind in list(self.clients.items()):
+            transport = writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > self.max_buffer:
+                self.clients[writer] = True  # Stop queueing deltas for a client that isn't reading
+                continue
+            data = frame
+            if behind:
+                data = self.keyframe()
+                self.clients[writer] = False
+            writer.write(data)
+            self.bytes_sent += len(data)
+        self.frames += 1
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._server = self.loop.run_until_complete(
+            asyncio.start_server(self._serve_client, self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self._server.close()
+            for writer in self.clients:
+                writer.close()
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.close()
+            self.loop = None
+
+    async def _serve_client(self, reader, writer):
+        data = self.keyframe()
+        writer.write(data)
+        self.bytes_sent += len(data)
+        self.clients[writer] = False
+        try:
+            while await reader.read(4096):
+                pass  # Clients only listen, reading is how a hang-up is noticed
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            pass  # Client went away or the server is shutting down
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+
+
+class TrackDecoder:
+    """Incremental decoder for the track stream, mirroring the server's state."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.aircraft = {}  # hex -> [field values in FIELDS order]
+        self.timestamp = 0.0  # Server time of the last frame applied
+
+    def feed(self, data):
+        """Add received bytes and apply every complete frame; returns how many were applied."""
+        buf = self.buffer
+        buf += data
+        start = 0
+        applied = 0
+        while len(buf) - start >= FRAME_HEADER.size:
+            length, kind, timestamp, upserts, removals = FRAME_HEADER.unpack_from(buf, start)
+            body = start + FRAME_HEADER.size
+            if body + length > len(buf):
+                break
+            self._apply(buf, body, kind, upserts, removals)
+            self.timestamp = timestamp
+            start = body + length
+            applied += 1
+        # Compact once per read instead of once per frame
+        del buf[:start]
+        return applied
+
+    def _apply(self, buf, pos, kind, upserts, removals):
+        aircraft = self.aircraft
+        if kind == KEYFRAME:
+            aircraft.clear()
+        for _ in range(upserts):
+            key, pos = _read_text(buf, pos)
+            mask = MASK.unpack_from(buf, pos)[0]
+            pos += 2
+            values = aircraft.get(key)
+            if values is None:
+                values = aircraft[key] = list(EMPTY_RECORD)
+            bit = 0
+            while mask:
+                if mask & 1:
+                    values[bit], pos = READERS[bit](buf, pos)
+                mask >>= 1
+                bit += 1
+        for _ in range(removals):
+            key, pos = _read_text(buf, pos)
+            aircraft.pop(key, None)
+
+    def fill(self, table):
+        """Write the mirrored aircraft into a cleared table, seen_pos as of the last frame."""
+        now = self.timestamp
+        for key, values in self.aircraft.items():
+            lat, lon, alt, gs, track, mag_heading, pos_time, ground, flight, emergency, ac_type, squawk = values
+            i = table.row_for(key, NAN)
+            table.set_row(
+                i, key, flight, lat, lon, "ground" if ground else alt, gs, track, mag_heading,
+                emergency, ac_type, squawk, now - pos_time,
+            )
+
+
+class TrackClient(threading.Thread):
+    """Mirrors a TrackServer into a snapshot buffer; a source for TrafficCore in place of polling."""
+
+    def __init__(self, snapshots, host, port=DEFAULT_PORT):
+        super().__init__(name="track-client", daemon=True)
+        self.snapshot_ready = Signal()
+        self.snapshots = snapshots
+        self.host = host
+        self.port = port
+        self.loop = None
+
+    def run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.loop = loop
+        task = loop.create_task(self._receive())
+        try:
+            loop.run_forever()
+        finally:
+            task.cancel()
+            loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+            self.loop = None
+            loop.close()
+
+    def stop(self):
+        """Disconnect and wait for the thread to finish."""
+        loop = self.loop
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        if self.is_alive():
+            self.join()
+
+    async def _receive(self):
+        delay = 1
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                print(f"Track server {self.host}:{self.port} unavailable ({e}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+
+            print(f"Connected to track server {self.host}:{self.port}")
+            delay = 1
+            decoder = TrackDecoder()  # Every connection starts with a keyframe
+            try:
+                while True:
+                    data = await reader.read(1 << 16)
+                    if not data:
+                        print("Track server closed the connection")
+                        break
+                    # Frames that arrived together are published once, as of the newest
+                    if decoder.feed(data):
+                        with self.snapshots.writing() as table:
+                            decoder.fill(table)
+                        self.snapshot_ready.emit()
+            except OSError as e:
+                print(f"Track server connection lost: {e}")
+            finally:
+                writer.close()
+            await asyncio.sleep(delay)
+
+
+class CoverageScope:
+    """Stands in for a display on a headless core: always asks for the facility's whole coverage."""
+
+    def __init__(self, circles):
+        self.circles = circles
+
+    def circles_for_view(self):
+        return self.circles
+
+    def visible_range_nm(self):
+        return max(dist for _, _, dist in self.circles)
+
+
+def run_headless(core, stop):
+    """Drive a TrafficCore without an event loop until stop is set.
+
+    Snapshots are swapped on the ingest thread as they are published, and polls
+    are started from the calling thread one at a time as each one finishes.
+    """
+    finished = queue.Queue()
+    core.source_ready.connect(core.swap)
+    if core.polling:
+        core.poll_finished.connect(lambda *outcome: finished.put(outcome))
+    core.start()
+    delay = core.next_delay()
+    while not stop.wait(delay):
+        if not core.poll():
+            delay = core.next_delay()  # Streaming source, or nothing attached yet
+            continue
+        try:
+            outcome = finished.get(timeout=core.scheduler.max_interval)
+        except queue.Empty:
+            delay = 0  # Never reported back (e.g. the engine was still starting), try again
+            continue
+        delay = core.record_poll(*outcome)
+
+
+def main():
+    import argparse
+    from .coveragePlanner import circle_bounds, plan_coverage
+    from .geojsonLoader import GeoJsonLoader
+    from .projection import MAX_RANGE_NM
+    from .trafficCore import TrafficCore
+    from .trafficFilter import TrafficFilter
+
+    parser = argparse.ArgumentParser(description="Headless RadarView track server")
+    parser.add_argument("--tracon", required=True, help="Facility whose coverage, receiver and history settings apply")
+    parser.add_argument("--config", default="Resources/.TraconConfig", help="TRACON config file")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on, 0.0.0.0 to serve other machines")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        tracon_configs = json.load(f)
+    if args.tracon not in tracon_configs:
+        print(f"TRACON {args.tracon} not found in {args.config}")
+        sys.exit(1)
+    config = tracon_configs[args.tracon]
+
+    # The coverage a scope would start with: the configured box, or the video map plus a margin
+    radar_lat, radar_lon = config["radar_settings"]["lat_lon"]
+    loader = GeoJsonLoader()
+    if config["radar_settings"].get("coverage") is None:
+        loader.load_file(config["geojson_file"], bbox=circle_bounds(radar_lat, radar_lon, MAX_RANGE_NM))
+    circles = plan_coverage(config, loader)
+    print(f"Covering {args.tracon} with {len(circles)} query circle(s): {circles}")
+
+    core = TrafficCore(tracon_configs, args.tracon)
+    server = TrackServer(args.host, args.port)
+    core.snapshots.sinks.append(server)
+    core.attach(CoverageScope(circles), TrafficFilter.from_config(config.get("filters", {}), (radar_lat, radar_lon)))
+    print(f"Serving {args.tracon} traffic on {args.host}:{server.start()}, Ctrl+C to stop")
+
+    stop = threading.Event()
+    try:
+        run_headless(core, stop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        core.shutdown()
+        server.stop()
+        print(f"Sent {server.frames} frames, {server.bytes_sent / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
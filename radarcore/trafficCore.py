@@ -0,0 +1,161 @@
+from .aircraftTable import SnapshotBuffer
+from .pollScheduler import PollScheduler
+from .signals import Signal
+from .trailStore import TrailStore
+
+
+class TrafficCore:
+    """One ingest pipeline and track store shared by every consumer in the process.
+
+    The core owns the data source, the snapshot buffer, the history and export
+    sinks, the trails and the poll schedule. Each scope attaches with its own
+    traffic filter; the filters all run on the ingest thread when a snapshot
+    is published, so a scope only projects and draws what it shows. Polls
+    cover the union of what the attached scopes want.
+
+    A scope is anything with circles_for_view() and visible_range_nm(). The
+    source reports through source_ready and poll_finished on its own thread;
+    whoever hosts the core calls swap() on its consumer thread in response and
+    poll() when next_delay() says so.
+
+    With a server block ({"host", "port"}, passed in or in the facility's config)
+    the core mirrors a headless trackServer instead of ingesting by itself, and
+    leaves history and export to the server rather than recording them twice.
+    """
+
+    def __init__(self, tracon_configs, tracon_id, server=None):
+        self.tracon_configs = tracon_configs
+        self.tracon_id = tracon_id  # Facility whose receiver, trail, history and export settings apply
+        self.scopes = []
+        self.snapshot_ready = Signal()  # A new table is in front and its trails are recorded
+        config = tracon_configs[tracon_id]
+
+        self.snapshots = SnapshotBuffer()
+        self.aircraft_data = self.snapshots.front()
+
+        trails = config.get("trails", {})
+        self.trails = TrailStore(minutes=trails.get("minutes", 5), sample_seconds=trails.get("sample_seconds", 2.0))
+
+        server = server or config.get("server")
+
+        # Every published snapshot is also recorded to the track history database
+        history = config.get("history", {})
+        self.history_writer = None
+        if history.get("enabled", True) and not server:
+            from .trackHistory import HistoryWriter, DEFAULT_HISTORY_PATH
+            self.history_writer = HistoryWriter(
+                history.get("path", DEFAULT_HISTORY_PATH),
+                retention_hours=history.get("retention_hours", 24),
+            )
+            self.history_writer.start()
+            self.snapshots.sinks.append(self.history_writer)
+
+        # Optionally also stream every snapshot to columnar files for offline analysis
+        export = config.get("export", {})
+        self.track_exporter = None
+        if export.get("enabled", False) and not server:
+            from .trackExport import TrackExporter, DEFAULT_EXPORT_DIR
+            self.track_exporter = TrackExporter(
+                export.get("path", DEFAULT_EXPORT_DIR),
+                tracon_id,
+                file_format=export.get("format"),
+            )
+            self.track_exporter.start()
+            self.snapshots.sinks.append(self.track_exporter)
+
+        self.scheduler = PollScheduler(base_interval=2.0)
+
+        receiver = config.get("receiver")
+        if server:
+            # A track server in the room already polls and tracks, just follow its stream
+            from .trackServer import TrackClient, DEFAULT_PORT
+            self.polling = False
+            self.data_fetcher = TrackClient(
+                self.snapshots, server.get("host", "127.0.0.1"), server.get("port", DEFAULT_PORT)
+            )
+        elif receiver:
+            # A local dump1090-style receiver pushes its own updates, no polling needed
+            from .receiverIngest import ReceiverSource
+            self.polling = False
+            radar_lat, radar_lon = config["radar_settings"]["lat_lon"]
+            self.data_fetcher = ReceiverSource(
+                self.snapshots,
+                receiver.get("host", "127.0.0.1"),
+                receiver.get("port", 30003),
+                receiver.get("protocol", "sbs"),
+                radar_lat,
+                radar_lon,
+            )
+        else:
+            # Data fetcher setup: the engine polls its query circles on its own asyncio thread.
+            # The circles are only known once scopes are attached, at the first poll
+            from .fetchEngine import FetchEngine
+            self.polling = True
+            self.data_fetcher = FetchEngine([], self.snapshots)
+        self.source_ready = self.data_fetcher.snapshot_ready
+        self.poll_finished = self.data_fetcher.poll_finished if self.polling else None
+
+    def start(self):
+        self.data_fetcher.start()
+
+    def attach(self, scope, traffic_filter):
+        """Start feeding a scope."""
+        self.scopes.append(scope)
+        self.snapshots.scope_filters[scope] = traffic_filter
+
+    def set_filter(self, scope, traffic_filter):
+        # Swapping the filter object is atomic, the ingest thread picks it up at its next publish
+        self.snapshots.scope_filters[scope] = traffic_filter
+
+    def detach(self, scope):
+        """Stop feeding a scope; returns True if it was the last one."""
+        if scope not in self.scopes:
+            return False
+        self.scopes.remove(scope)
+        self.snapshots.scope_filters.pop(scope, None)
+        return not self.scopes
+
+    def swap(self):
+        """Bring the newest published snapshot to the front and record trails once for every scope."""
+        table = self.snapshots.swap()
+        self.aircraft_data = table
+
+        shown = set()
+        for rows in table.scope_visible.values():
+            shown.update(rows)
+        now = table.timestamp
+        trails = self.trails
+        for i in shown:
+            trails.record(table.hex[i] or table.flight[i], table.lat[i], table.lon[i], now)
+        trails.prune(now - 120)  # Tracks that dropped out of coverage
+
+        self.snapshot_ready.emit()
+        return table
+
+    def poll(self):
+        """Start a poll of the union of the scopes' circles; False if there is nothing to poll."""
+        if not self.polling or not self.scopes:
+            return False
+        circles = {}  # Scopes showing the same coverage ask for the same circles
+        for scope in self.scopes:
+            circles.update(dict.fromkeys(tuple(circle) for circle in scope.circles_for_view()))
+        self.scheduler.set_view_range(min(scope.visible_range_nm() for scope in self.scopes))
+        self.data_fetcher.set_circles(circles)
+        self.data_fetcher.poll()
+        return True
+
+    def record_poll(self, status, latency, retry_after):
+        """Feed back the outcome of a poll; returns seconds until the next one."""
+        self.scheduler.record(status, latency, retry_after)
+        return self.scheduler.next_delay()
+
+    def next_delay(self):
+        return self.scheduler.next_delay()
+
+    def shutdown(self):
+        """Stop the fetch engine, history writer and exporter."""
+        self.data_fetcher.stop()
+        if self.history_writer is not None:
+            self.history_writer.stop()  # Flushes the last batch
+        if self.track_exporter is not None:
+            self.track_exporter.stop()  # Closes the open export file
@@ -0,0 +1,108 @@
+import math
+
+MAX_RANGE_NM = 174  # map_to_radar_coords drops anything past 200 statute miles
+
+
+class TrafficFilter:
+    """Display filters compiled once into column-wise passes over an AircraftTable.
+
+    apply() runs when a snapshot is published, on the ingest thread, and
+    records the surviving rows in table.visible so the renderer only walks
+    aircraft it will actually draw.
+    """
+
+    def __init__(self, min_alt=None, max_alt=18000, max_range_nm=MAX_RANGE_NM, center=None,
+                 types=None, squawks=None, include_ground=False):
+        self.min_alt = min_alt
+        self.max_alt = max_alt
+        self.max_range_nm = max_range_nm
+        self.center = center  # (lat, lon) the range is measured from
+        self.types = set(types) if types else None
+        self.squawks = {str(code) for code in squawks} if squawks else None
+        self.include_ground = include_ground
+        self._passes = self._compile()
+
+    @classmethod
+    def from_config(cls, config, center):
+        """Build from a TRACON config "filters" block; missing keys keep the defaults."""
+        return cls(
+            min_alt=config.get("min_alt"),
+            max_alt=config.get("max_alt", 18000),
+            max_range_nm=config.get("max_range_nm", MAX_RANGE_NM),
+            center=center,
+            types=config.get("types"),
+            squawks=config.get("squawks"),
+            include_ground=config.get("include_ground", False),
+        )
+
+    def apply(self, table):
+        """Return the rows of table passing every filter and store them as table.visible."""
+        table.visible = self.select(table)
+        return table.visible
+
+    def select(self, table):
+        """Return the rows of table passing every filter, leaving the table alone."""
+        rows = range(table.size)
+        for narrow in self._passes:
+            rows = narrow(table, rows)
+        return rows if isinstance(rows, list) else list(rows)
+
+    def _compile(self):
+        # Cheapest and most selective passes first; each one only looks at the
+        # rows that survived the previous one
+        passes = [_has_position]
+        if not self.include_ground:
+            passes.append(_airborne)
+        if self.min_alt is not None or self.max_alt is not None:
+            passes.append(_altitude_between(
+                -math.inf if self.min_alt is None else self.min_alt,
+                math.inf if self.max_alt is None else self.max_alt,
+            ))
+        if self.max_range_nm is not None and self.center is not None:
+            passes.append(_within_range(self.center, self.max_range_nm))
+        if self.types:
+            passes.append(_text_in("type", self.types))
+        if self.squawks:
+            passes.append(_text_in("squawk", self.squawks))
+        return passes
+
+
+def _has_position(table, rows):
+    lat = table.lat
+    lon = table.lon
+    # NaN never equals itself
+    return [i for i in rows if lat[i] == lat[i] and lon[i] == lon[i]]
+
+
+def _airborne(table, rows):
+    ground = table.ground
+    return [i for i in rows if not ground[i]]
+
+
+def _altitude_between(low, high):
+    def narrow(table, rows):
+        alt = table.alt
+        return [i for i in rows if low <= alt[i] <= high]
+    return narrow
+
+
+def _within_range(center, max_range_nm):
+    center_lat, center_lon = center
+    kx = 60 * math.cos(math.radians(center_lat))
+    limit = max_range_nm * max_range_nm
+
+    def narrow(table, rows):
+        lat = table.lat
+        lon = table.lon
+        return [
+            i for i in rows
+            if ((lon[i] - center_lon) * kx) ** 2 + ((lat[i] - center_lat) * 60) ** 2 <= limit
+        ]
+    return narrow
+
+
+def _text_in(column, values):
+    def narrow(table, rows):
+        data = getattr(table, column)
+        return [i for i in rows if data[i] in values]
+    return narrow
@@ -0,0 +1,177 @@
+import math
+from array import array
+from itertools import islice
+
+RESOLUTION_DEG = 1e-5  # Quantisation step, about a metre
+MAX_STEP = 32767  # Largest delta an int16 holds, ~0.33 degrees between two samples
+
+
+class Trail:
+    """One aircraft's history: its newest position plus a ring of int16 steps back to the oldest."""
+
+    __slots__ = ("lat", "lon", "dlat", "dlon", "head", "count", "last_time", "started", "samples")
+
+    def __init__(self, capacity):
+        self.lat = 0
+        self.lon = 0
+        self.dlat = array("h", [0]) * capacity
+        self.dlon = array("h", [0]) * capacity
+        self.head = 0  # Where the next step is written
+        self.count = 0  # Positions held, including the newest one
+        self.last_time = 0.0
+        self.started = 0.0  # Time of the first sample since the trail (re)started
+        self.samples = 0  # Samples recorded since then, unlike count never capped
+
+    def nbytes(self):
+        return self.dlat.itemsize * len(self.dlat) + self.dlon.itemsize * len(self.dlon)
+
+
+class TrailStore:
+    """Position history for every track in preallocated, delta-encoded ring buffers.
+
+    Positions are quantised to RESOLUTION_DEG and stored as the step from the
+    previous sample, so 30 minutes at one sample every 2 seconds costs under
+    4 kB per aircraft instead of a deque of float tuples.
+    """
+
+    def __init__(self, minutes=5, sample_seconds=2.0):
+        self.sample_seconds = sample_seconds
+        self.capacity = max(int(minutes * 60 / sample_seconds), 1)
+        self.trails = {}
+
+    def __contains__(self, key):
+        return key in self.trails
+
+    def __len__(self):
+        return len(self.trails)
+
+    def clear(self):
+        self.trails.clear()
+
+    def record(self, key, lat, lon, now):
+        """Add a position for key, at most one every sample_seconds."""
+        trail = self.trails.get(key)
+        if trail is None:
+            trail = self.trails[key] = Trail(self.capacity)
+        elif now - trail.last_time < self.sample_seconds:
+            return
+
+        qlat = round(lat / RESOLUTION_DEG)
+        qlon = round(lon / RESOLUTION_DEG)
+        step_lat = qlat - trail.lat
+        step_lon = qlon - trail.lon
+        if trail.count and -MAX_STEP <= step_lat <= MAX_STEP and -MAX_STEP <= step_lon <= MAX_STEP:
+            trail.dlat[trail.head] = step_lat
+            trail.dlon[trail.head] = step_lon
+            trail.head = (trail.head + 1) % self.capacity
+            trail.count = min(trail.count + 1, self.capacity + 1)
+            trail.samples += 1
+        else:
+            trail.count = 1  # First sample, or a jump too big to encode: start over from here
+            trail.started = now
+            trail.samples = 1
+        trail.lat = qlat
+        trail.lon = qlon
+        trail.last_time = now
+
+    def prune(self, older_than):
+        """Forget tracks with no sample since older_than."""
+        stale = [key for key, trail in self.trails.items() if trail.last_time < older_than]
+        for key in stale:
+            del self.trails[key]
+
+    def points(self, key, min_spacing_deg=0.0):
+        """Yield (lat, lon) newest first, skipping points within min_spacing_deg of the last one yielded."""
+        trail = self.trails.get(key)
+        if trail is None or not trail.count:
+            return
+        spacing = min_spacing_deg / RESOLUTION_DEG
+        lat = trail.lat
+        lon = trail.lon
+        last_lat = lat
+        last_lon = lon
+        yield lat * RESOLUTION_DEG, lon * RESOLUTION_DEG
+
+        dlat = trail.dlat
+        dlon = trail.dlon
+        i = trail.head
+        capacity = self.capacity
+        for _ in range(trail.count - 1):
+            i = i - 1 if i else capacity - 1
+            lat -= dlat[i]
+            lon -= dlon[i]
+            if abs(lat - last_lat) + abs(lon - last_lon) < spacing:
+                continue
+            last_lat = lat
+            last_lon = lon
+            yield lat * RESOLUTION_DEG, lon * RESOLUTION_DEG
+
+
+class _ProjectedTrail:
+    __slots__ = ("xs", "ys", "started", "samples")
+
+    def __init__(self, started):
+        self.xs = array("d")  # Oldest first, NaN where the point is out of range
+        self.ys = array("d")
+        self.started = started
+        self.samples = 0
+
+
+class ProjectedTrails:
+    """One scope's view of a TrailStore in projected coordinates.
+
+    The store is shared by every scope and holds positions; each scope projects
+    them about its own centre. update() runs once per data update and projects
+    only the samples added since the previous one, so painting reads ready-made
+    coordinates. Points beyond the projection's range are NaN.
+    """
+
+    def __init__(self):
+        self.store = None
+        self.projection = None
+        self.trails = {}
+
+    def update(self, store, projection, keys):
+        """Bring the trails of keys up to date; a new store or projection starts from scratch."""
+        if store is not self.store or projection is not self.projection:
+            self.store = store
+            self.projection = projection
+            self.trails = {}
+        cache = self.trails
+        forward = projection.forward
+        for key in keys:
+            trail = store.trails.get(key)
+            if trail is None or not trail.count:
+                continue
+            projected = cache.get(key)
+            if projected is None or projected.started != trail.started:
+                projected = cache[key] = _ProjectedTrail(trail.started)
+                new = trail.count
+            else:
+                new = min(trail.samples - projected.samples, trail.count)
+                if not new:
+                    continue
+            points = list(islice(store.points(key), new))
+            xs = projected.xs
+            ys = projected.ys
+            for lat, lon in reversed(points):
+                point = forward(lat, lon)
+                x, y = point if point is not None else (math.nan, math.nan)
+                xs.append(x)
+                ys.append(y)
+            excess = len(xs) - trail.count  # Samples the ring has overwritten since
+            if excess > 0:
+                del xs[:excess]
+                del ys[:excess]
+            projected.samples = trail.samples
+
+        if len(cache) > len(store.trails):
+            for key in [key for key in cache if key not in store.trails]:
+                del cache[key]  # Pruned from the store
+
+    def get(self, key):
+        """(xs, ys) of a trail oldest first, or None if it hasn't been projected."""
+        projected = self.trails.get(key)
+        if projected is None:
+            return None
+        return projected.xs, projected.ys
@@ -0,0 +1,64 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from radarcore.trafficCore import TrafficCore
+
+
+class TrafficHub(QObject):
+    """Qt host for the TrafficCore every scope window in the process shares.
+
+    The core's ingest thread reports through queued signals so swaps happen on
+    the GUI thread, and a single-shot QTimer drives polling because scopes can
+    only be asked what they show from the GUI thread.
+    """
+    snapshot_ready = pyqtSignal()  # A new table is in front and its trails are recorded
+    _published = pyqtSignal()  # Re-emitted from the ingest thread, delivered on the GUI thread
+    _poll_finished = pyqtSignal(int, float, float)
+
+    def __init__(self, tracon_configs, tracon_id, map_cache, server=None, parent=None):
+        super().__init__(parent)
+        self.core = TrafficCore(tracon_configs, tracon_id, server)
+        self.tracon_configs = tracon_configs
+        self.map_cache = map_cache
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.poll)
+
+        self._published.connect(self.on_snapshot)
+        self.core.source_ready.connect(self._published.emit)
+        if self.core.polling:
+            self._poll_finished.connect(self.on_poll_finished)
+            self.core.poll_finished.connect(self._poll_finished.emit)
+            # Polls are rescheduled one at a time as each finishes, at an interval
+            # the scheduler adapts to latency, errors and the tightest zoom on screen
+            self.timer.start(int(self.core.next_delay() * 1000))
+        self.core.start()
+
+    def attach(self, scope, traffic_filter):
+        """Start feeding a scope; it must provide circles_for_view() and visible_range_nm()."""
+        self.core.attach(scope, traffic_filter)
+
+    def set_filter(self, scope, traffic_filter):
+        self.core.set_filter(scope, traffic_filter)
+
+    def detach(self, scope):
+        """Stop feeding a scope; the pipeline shuts down with the last one."""
+        if self.core.detach(scope):
+            self.timer.stop()
+            self.map_cache.shutdown()
+            self.core.shutdown()
+
+    def on_snapshot(self):
+        self.core.swap()
+        self.snapshot_ready.emit()
+
+    def poll(self):
+        if not self.core.polling:
+            return  # Streaming sources push updates by themselves
+        # Watchdog in case this poll never reports back (e.g. the engine is still starting)
+        self.timer.start(int(self.core.scheduler.max_interval * 1000))
+        self.core.poll()
+
+    def on_poll_finished(self, status, latency, retry_after):
+        """Schedule the next poll from the outcome of the last one."""
+        self.timer.start(int(self.core.record_poll(status, latency, retry_after) * 1000))
@@ -0,0 +1,59 @@
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QTransform
+
+
+class ViewTransform:
+    """Pan and zoom of the radar display as one QTransform.
+
+    World coordinates are projected radar units (x east, y north). The
+    transform scales them about the radar centre, flips y to screen-down and
+    adds the pan offset, so a painter given .transform draws world
+    coordinates directly and .inverse maps clicks back to the world. Panning
+    and zooming only rebuild the two matrices.
+    """
+
+    def __init__(self, center, scale=1.0):
+        self.center = QPointF(center)
+        self.offset = QPointF(0, 0)
+        self.scale = scale
+        self._rebuild()
+
+    def _rebuild(self):
+        origin = self.center + self.offset
+        self.transform = QTransform(self.scale, 0, 0, -self.scale, origin.x(), origin.y())
+        self.inverse, _ = self.transform.inverted()
+
+    def set_center(self, center):
+        self.center = QPointF(center)
+        self._rebuild()
+
+    def reset(self, scale=1.0):
+        self.offset = QPointF(0, 0)
+        self.scale = scale
+        self._rebuild()
+
+    def pan(self, delta):
+        """Move the picture by a screen delta in pixels."""
+        self.offset += QPointF(delta)
+        self._rebuild()
+
+    def zoom(self, factor):
+        """Zoom about the radar centre."""
+        self.scale *= factor
+        self._rebuild()
+
+    def zoom_at(self, pos, factor):
+        """Zoom keeping the world point under the screen position pos where it is."""
+        anchor = QPointF(pos) - self.center - self.offset
+        self.scale *= factor
+        self.offset -= anchor * (factor - 1)
+        self._rebuild()
+
+    def map(self, x, y):
+        """Screen position of a world point."""
+        return self.transform.map(QPointF(x, y))
+
+    def unmap(self, pos):
+        """World (x, y) under a screen position."""
+        point = self.inverse.map(QPointF(pos))
+        return point.x(), point.y()